@@ -0,0 +1,46 @@
+import numpy as np
+
+__all__ = ["build_alias", "sample_alias"]
+
+
+def build_alias(weights):
+    """
+    Vose alias table for integer weights: (prob, alias) arrays of length n.
+    Column k keeps position k with probability prob[k] and hands the rest of
+    its 1/n share to alias[k]. Worked in integers (each weight scaled by n,
+    one full column = total) so the table is exact for any weight sum.
+    """
+    weights = np.asarray(weights, dtype=np.int64)
+    n = weights.size
+    total = int(weights.sum())
+    if n == 0 or total <= 0:
+        raise ValueError("Loot pool is empty")
+
+    scaled = (weights * n).tolist()
+    alias = list(range(n))
+    small = [k for k, w in enumerate(scaled) if w < total]
+    large = [k for k, w in enumerate(scaled) if w >= total]
+
+    while small and large:
+        s = small.pop()
+        g = large[-1]
+        alias[s] = g
+        scaled[g] -= total - scaled[s]
+        if scaled[g] < total:
+            small.append(large.pop())
+
+    # integer bookkeeping is exact: whatever is left is a full column
+    prob = np.asarray(scaled, dtype=np.float64) / total
+    return prob, np.asarray(alias, dtype=np.int32)
+
+
+def sample_alias(prob, alias, u):
+    """
+    Map uniforms u in [0, 1) to positions with one uniform per draw: the
+    integer part of u * n picks the column, the fraction the coin inside it.
+    Scales `u` in place.
+    """
+    np.multiply(u, prob.size, out=u)
+    column = u.astype(np.intp)
+    u -= column
+    return np.where(u < prob[column], column, alias[column])
@@ -0,0 +1,132 @@
+# app/analysis.py
+"""
+Shared aggregation for simulation endpoints: every function takes the pool
+that was sampled plus the drawn positions from simulate_drop_indices().
+"""
+
+from typing import Any, Dict, List
+
+import numpy as np
+
+from app.autocorrect_engine import RARITY_ORDER
+from app.drop_engine import fold_draws, summarize_draws, tally_codes
+from app.indexes import (
+    ALL_TAGS_SORTED,
+    ITEM_NAME_CODES,
+    ITEM_RARITY,
+    NAME_LIST,
+    RARITY_CODE,
+    RARITY_NAMES,
+    TAG_INDICES,
+    TAG_INDPTR,
+    pool_rows,
+)
+
+TOP_ITEMS_LIMIT = 10
+TOP_RARITY_LIMIT = 3
+LEGENDARY_WARN_PERCENT = 0.5
+
+# Per CSR tag entry: the item row it belongs to and its slot in that
+# item's tag list (ties between tags first seen on the same drop)
+_TAG_ROWS = np.repeat(np.arange(TAG_INDPTR.size - 1), np.diff(TAG_INDPTR))
+_TAG_SLOTS = np.arange(TAG_INDICES.size) - TAG_INDPTR[_TAG_ROWS]
+_TAG_SLOT_SPAN = int(np.diff(TAG_INDPTR).max(initial=0)) + 1
+
+
+def rarity_percentages(
+    codes: np.ndarray, idx: np.ndarray, simulations: int, ndigits: int = 2, summary=None
+) -> Dict[str, float]:
+    """
+    {rarity: % of drops} in first-drawn order; codes from rarity_codes(pool).
+    `summary` is summarize_draws(idx, len(pool)) when the caller shares one.
+    """
+    return {
+        r: round((n / simulations) * 100, ndigits)
+        for r, n in tally_codes(codes, RARITY_NAMES, idx, summary).items()
+    }
+
+
+def tag_tally(items: List[Dict[str, Any]], idx: np.ndarray, summary=None) -> Dict[str, int]:
+    """
+    {tag: occurrences across drops} for a simulation over `items`, keyed in
+    first-drawn order, i.e. what Counter.update(item["tags"]) per drop gives.
+    """
+    idx, counts, first, _ = summary or summarize_draws(idx, len(items))
+    rows = pool_rows(items)
+    n_rows = TAG_INDPTR.size - 1
+
+    # pool positions -> table rows (a pool may list an item more than once)
+    row_counts = np.bincount(rows, weights=counts, minlength=n_rows)
+    row_first = np.full(n_rows, idx.size, dtype=np.int64)
+    np.minimum.at(row_first, rows, first)
+
+    # spread row totals onto their tag entries, then fold entries per tag
+    tag_counts = np.bincount(
+        TAG_INDICES, weights=row_counts[_TAG_ROWS], minlength=len(ALL_TAGS_SORTED)
+    ).astype(np.int64)
+    first_key = np.full(len(ALL_TAGS_SORTED), np.iinfo(np.int64).max, dtype=np.int64)
+    np.minimum.at(first_key, TAG_INDICES, row_first[_TAG_ROWS] * _TAG_SLOT_SPAN + _TAG_SLOTS)
+
+    seen = np.flatnonzero(tag_counts)
+    return {
+        ALL_TAGS_SORTED[code]: int(tag_counts[code])
+        for code in seen[np.argsort(first_key[seen])].tolist()
+    }
+
+
+def build_warnings(rarity_distribution: Dict[str, float]) -> List[str]:
+    warnings = []
+
+    if rarity_distribution.get("Legendary", 0) < LEGENDARY_WARN_PERCENT:
+        warnings.append("Legendary items drop less than 0.5% of the time.")
+
+    return warnings
+
+
+def analyze_drops(items: List[Dict[str, Any]], idx: np.ndarray, simulations: int) -> Dict[str, Any]:
+    """
+    Rarity distribution (tier order), top items overall and per rarity, and
+    warnings for one simulation run over `items`.
+    """
+    # Names are not unique (or rarity-consistent) across the table, so counts
+    # are per name and each name reports the rarity code of its last drawn item.
+    rows = pool_rows(items)
+    names = ITEM_NAME_CODES[rows]
+    codes = ITEM_RARITY[rows]
+
+    # one pass over the draws; everything below folds pool-sized arrays
+    summary = summarize_draws(idx, len(items))
+    rarity_counts = np.bincount(codes, weights=summary[1], minlength=len(RARITY_NAMES))
+    name_counts, name_first, name_last = fold_draws(names, len(NAME_LIST), summary)
+
+    # every drawn name, most drawn first, ties in first-drawn order (what
+    # a stable top-k over the first-drawn tally gives), with the rarity of
+    # its last drawn item
+    seen = np.flatnonzero(name_counts)
+    # one int64 key: count (scaled past any draw number) then first draw;
+    # first draws are distinct per name, so the key is unique
+    rank_key = name_first[seen] - name_counts[seen] * (len(idx) + 1)
+    ranked = seen[np.argsort(rank_key)]
+    ranked_rarity = codes[summary[0][name_last[ranked]]]
+
+    # enforce correct rarity order (canonical tier i has code i)
+    rarity_distribution = {
+        r: round((int(rarity_counts[code]) / simulations) * 100, 2)
+        for code, r in enumerate(RARITY_ORDER)
+        if rarity_counts[code]
+    }
+
+    def top(rows, limit):
+        return [(NAME_LIST[row], int(name_counts[row])) for row in rows[:limit].tolist()]
+
+    def top_by_rarity(target, limit=TOP_RARITY_LIMIT):
+        return top(ranked[ranked_rarity == RARITY_CODE[target]], limit)
+
+    return {
+        "rarity_distribution": rarity_distribution,
+        "top_items_overall": top(ranked, TOP_ITEMS_LIMIT),
+        "top_rare_items": top_by_rarity("Rare"),
+        "top_epic_items": top_by_rarity("Epic"),
+        "top_legendary_items": top_by_rarity("Legendary"),
+        "warnings": build_warnings(rarity_distribution),
+    }
@@ -1,21 +1,41 @@
 # app/autocorrect_engine.py
 
-from typing import Dict, List, Any, Tuple, Iterator
-from copy import deepcopy
+import hashlib
+import os
+import re
+import sys
+from collections import OrderedDict
+from dataclasses import dataclass
+from functools import lru_cache
+from threading import Lock
+from types import MappingProxyType
+from typing import Dict, List, Any, Tuple, Iterator, Mapping
+
+import numpy as np
+import orjson
+
+from app.import_rules import EMPTY_STATS, EMPTY_TAGS, RARITY_INDEX
 
 # ============================================================
 # Profile Definitions
 # ============================================================
 
-AUTO_CORRECT_PROFILES = {"safe", "aggressive", "strict"}
+# Profile tables are read-only views; get_profile_capabilities hands out
+# references, so nothing downstream may mutate them.
+AUTO_CORRECT_PROFILES = frozenset({"safe", "aggressive", "strict"})
 
-SEVERITY_LEVELS = {
+SEVERITY_LEVELS = MappingProxyType({
     "safe": 1,
     "aggressive": 2,
     "strict": 3,
-}
+})
+
+# Bucket slot per severity (level - 1); resolved once instead of per fix
+_SEV_SAFE = SEVERITY_LEVELS["safe"] - 1
+_SEV_AGGRESSIVE = SEVERITY_LEVELS["aggressive"] - 1
+_SEV_STRICT = SEVERITY_LEVELS["strict"] - 1
 
-PROFILE_CAPABILITIES = {
+_PROFILE_CAPABILITIES = {
     "safe": {
         "preview": True,
         "apply": True,
@@ -42,7 +62,26 @@ PROFILE_CAPABILITIES = {
     },
 }
 
+PROFILE_CAPABILITIES = MappingProxyType({
+    profile: MappingProxyType(caps) for profile, caps in _PROFILE_CAPABILITIES.items()
+})
+
 RARITY_ORDER = ["Common", "Uncommon", "Rare", "Epic", "Legendary"]
+# Phase 4 tier columns follow RARITY_INDEX (same tier order; custom tiers miss)
+_EPIC = RARITY_INDEX["Epic"]
+_LEGENDARY = RARITY_INDEX["Legendary"]
+
+# Phase 4 thresholds (tunable, indie-friendly defaults)
+_PROGRESSION_LIFT = 1.10       # each tier's avg power >= 10% above previous
+_LEGENDARY_LIFT = 1.10         # Legendary avg power >= 10% above Epic
+_LEGENDARY_SHARE_MAX = 1.0     # % of total weight
+_DOMINANCE_MAX = 0.50          # top-5 share of a tier's weight
+
+# Validator message markers used to classify errors/warnings into fixes.
+# Prefixes are matched with str.startswith (validator messages lead with them).
+_DROP_WEIGHT_PREFIX = "drop.weight"
+_MISSING_TAGS_PREFIX = "Missing optional field 'tags'"
+_RARITY_MATCH_MARKER = "must match container rarity"
 
 STAT_IMPACT_WEIGHTS = {
     "attack": 1.0,
@@ -56,13 +95,74 @@ STAT_IMPACT_WEIGHTS = {
     "cooldown_reduction": 1.8,
 }
 
+# ============================================================
+# Fix Records
+# ============================================================
+
+@dataclass(frozen=True, slots=True)
+class Fix:
+    """
+    One detected issue + proposed correction.
+    `op` names the apply handler and `addr` the target item as
+    (category, type, rarity, idx); both are SAFE-only and never serialized.
+    """
+    path: str
+    issue: str
+    before: Any
+    after: Any
+    action: str
+    severity: str
+    op: str | None = None
+    addr: Tuple[str, str, str, int] | None = None
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "path": self.path,
+            "issue": self.issue,
+            "before": _fresh(self.before),
+            "after": _fresh(self.after),
+            "action": self.action,
+            "severity": self.severity,
+        }
+
+
+def _fresh(value: Any) -> Any:
+    """
+    Copy of a before/after value: Fix records may be shared by cached
+    previews, so callers never get the stored list/dict objects.
+    """
+    if isinstance(value, dict):
+        return {k: _fresh(v) for k, v in value.items()}
+    if isinstance(value, list):
+        return [_fresh(v) for v in value]
+    return value
+
+
+def serialize_preview(preview: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    JSON-ready preview: Fix records -> plain dicts (response boundary only).
+    """
+    return {**preview, "fixes": [fix.to_dict() for fix in preview["fixes"]]}
+
+
 # ============================================================
 # Helpers
 # ============================================================
 
+# "common"/"Common" -> interned canonical tier name
+_RARITY_CANON = {
+    spelling: sys.intern(r)
+    for r in RARITY_ORDER
+    for spelling in (r, r[:1].lower() + r[1:])
+}
+
+
 def _norm_rarity(r: str) -> str:
-    if not isinstance(r, str):
+    if type(r) is not str:
         return str(r)
+    canon = _RARITY_CANON.get(r)
+    if canon is not None:
+        return canon
     # keep exact "Common" style
     return r[:1].upper() + r[1:]
 
@@ -83,9 +183,10 @@ def _iter_items(loot_table: Dict[str, Any]) -> Iterator[Tuple[str, str, str, int
             for rarity_name, items in type_block.items():
                 if not isinstance(items, list):
                     continue
+                rarity = _norm_rarity(rarity_name)
                 for idx, item in enumerate(items):
                     if isinstance(item, dict):
-                        yield category_name, item_type_name, _norm_rarity(rarity_name), idx, item
+                        yield category_name, item_type_name, rarity, idx, item
 
 
 def _path(cat: str, typ: str, rarity: str, idx: int, field: str | None = None) -> str:
@@ -100,51 +201,131 @@ def _power_score(item: Dict[str, Any]) -> float:
     Simple "power" heuristic:
     sum of numeric stats (if present), else 0.
     """
-    stats = item.get("stats", {})
-    if not isinstance(stats, dict):
+    try:
+        stats = item["stats"]
+    except KeyError:
+        return 0.0
+    if type(stats) is not dict:
         return 0.0
+    # exact type checks (pointer compares, no MRO walk); bools are flags, not power
     total = 0.0
     for v in stats.values():
-        if isinstance(v, (int, float)):
+        t = type(v)
+        if t is float:
+            total += v
+        elif t is int:
             total += float(v)
     return total
 
 
 def _safe_weight(item: Dict[str, Any]) -> int:
-    drop = item.get("drop", {})
-    if not isinstance(drop, dict):
-        return 0
-    w = drop.get("weight", 0)
-    if isinstance(w, bool):
+    # Happy path is a plain double subscript; missing/odd drop blocks fall out
+    try:
+        w = item["drop"]["weight"]
+    except (KeyError, TypeError):
         return 0
-    if isinstance(w, (int, float)):
+    t = type(w)
+    if t is int:
+        return w
+    if t is float:
         return int(w)
+    # bool, str, None, ... count as no weight
     return 0
 
 
-def _weight_concentration(weights: List[int]) -> float:
+def _weight_concentration(weights: "np.ndarray | List[int]") -> float:
     """
     Returns "dominance" ratio: (sum of top 5 weights) / (sum of all weights).
     0..1. Higher = fewer items dominate.
     """
-    if not weights:
-        return 0.0
-    total = sum(max(0, int(w)) for w in weights)
+    w = np.maximum(np.asarray(weights, dtype=np.int64), 0)
+    total = int(w.sum())
     if total <= 0:
         return 0.0
-    top = sorted((max(0, int(w)) for w in weights), reverse=True)[:5]
-    return sum(top) / total
+    # introselect: O(N) top-k without sorting the whole tier
+    k = min(5, w.size)
+    top = int(np.partition(w, -k)[-k:].sum())
+    return top / total
+
+def _phase4_kernel(
+    rar_idx: np.ndarray,
+    power: np.ndarray,
+    weight: np.ndarray,
+    n_tiers: int,
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Per-tier aggregates from SoA columns (tier code, power, drop weight):
+    (power_sum, item_count, clamped_weight_sum, raw_weight_sum, top5_dominance).
+    Weight sums stay int64 so large totals don't round through float64.
+    """
+    count = np.bincount(rar_idx, minlength=n_tiers)
+    power_sum = np.bincount(rar_idx, weights=power, minlength=n_tiers)
+
+    # Group weights by tier (stable: table order kept inside a tier)
+    order = np.argsort(rar_idx, kind="stable")
+    bounds = np.searchsorted(rar_idx[order], np.arange(n_tiers + 1))
+    grouped = weight[order]
+    clamped = np.maximum(grouped, 0)
+
+    # Segment sums from prefix sums (reduceat misbehaves on empty tiers)
+    raw_cs = np.concatenate(([0], np.cumsum(grouped)))
+    clamped_cs = np.concatenate(([0], np.cumsum(clamped)))
+    raw_sum = raw_cs[bounds[1:]] - raw_cs[bounds[:-1]]
+    clamped_sum = clamped_cs[bounds[1:]] - clamped_cs[bounds[:-1]]
+
+    dominance = np.zeros(n_tiers, dtype=np.float64)
+    for i in range(n_tiers):
+        if clamped_sum[i] > 0:
+            dominance[i] = _weight_concentration(clamped[bounds[i]:bounds[i + 1]])
+
+    return power_sum, count, clamped_sum, raw_sum, dominance
+
 
 def _compute_item_power(item: Dict[str, Any]) -> float:
-    stats = item.get("stats", {})
-    score = 0.0
-    
-    for stat, value in stats.items():
-        weight = STAT_IMPACT_WEIGHTS.get(stat, 0.5)
-        if isinstance(value, (int, float)):
-            score += value * weight
-    
-    return round(score, 2) 
+    stats = item.get("stats", EMPTY_STATS)
+    if type(stats) is not dict:
+        return 0.0
+
+    weight_of = STAT_IMPACT_WEIGHTS.get
+    score = sum(
+        (value * weight_of(stat, 0.5)
+         for stat, value in stats.items()
+         if type(value) is int or type(value) is float),
+        0.0,
+    )
+
+    return round(score, 2)
+
+
+# ============================================================
+# Preview Cache
+# ============================================================
+
+# Off by default: the key serializes and hashes the whole table (~2.8ms on
+# the bundled table vs ~4ms to build a preview), so it only pays where the
+# same table is resubmitted most of the time (e.g. a CI loop). Set
+# LOOT_API_PREVIEW_CACHE to the number of previews to keep.
+PREVIEW_CACHE_SIZE = int(os.environ.get("LOOT_API_PREVIEW_CACHE") or 0)
+
+_preview_cache: "OrderedDict[Tuple[bytes, str], Dict[str, Any]]" = OrderedDict()
+_preview_cache_lock = Lock()
+
+
+def _digest(obj: Any) -> bytes:
+    # Key order is not normalized: a reordered but equal table just misses
+    return hashlib.blake2b(orjson.dumps(obj), digest_size=16).digest()
+
+
+def _copy_preview(preview: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Fresh top-level containers so callers can't mutate the cached snapshot.
+    """
+    return {
+        **preview,
+        "summary": dict(preview["summary"]),
+        "fixes": list(preview["fixes"]),  # frozen; to_dict copies before/after
+        "warnings": list(preview["warnings"]),
+    }
 
 
 # ============================================================
@@ -156,11 +337,84 @@ def generate_autocorrect_preview(
     validation_result: Dict[str, Any],
     profile: str = "safe",
 ) -> Dict[str, Any]:
-
+    """
+    Builds the auto-correct preview for a profile.
+    validation_result must be validate_loot_table(loot_table): with
+    PREVIEW_CACHE_SIZE set, results are LRU-cached on a content hash of the
+    table + profile only, so re-submitting the same table skips the scan.
+    """
     if profile not in AUTO_CORRECT_PROFILES:
         raise ValueError(f"Invalid auto-correct profile: {profile}")
 
-    fixes: List[Dict[str, Any]] = []
+    if not PREVIEW_CACHE_SIZE:
+        return _build_autocorrect_preview(loot_table, validation_result, profile)
+
+    try:
+        key = (_digest(loot_table), profile)
+    except TypeError:
+        # Not JSON-serializable (e.g. non-str keys): no stable key, don't cache
+        return _build_autocorrect_preview(loot_table, validation_result, profile)
+
+    with _preview_cache_lock:
+        cached = _preview_cache.get(key)
+        if cached is not None:
+            _preview_cache.move_to_end(key)
+            return _copy_preview(cached)
+
+    preview = _build_autocorrect_preview(loot_table, validation_result, profile)
+
+    with _preview_cache_lock:
+        _preview_cache[key] = preview
+        if len(_preview_cache) > PREVIEW_CACHE_SIZE:
+            _preview_cache.popitem(last=False)
+
+    return _copy_preview(preview)
+
+
+def _build_autocorrect_preview(
+    loot_table: Dict[str, Any],
+    validation_result: Dict[str, Any],
+    profile: str,
+) -> Dict[str, Any]:
+    # One bucket per severity: (safe, aggressive, strict). Every stage runs,
+    # since total_detected_issues counts fixes the profile does not apply,
+    # but buckets above the profile's level get a None per issue instead of
+    # a Fix; the profile gate is then a slice over the buckets.
+    level = SEVERITY_LEVELS[profile]
+    buckets: Tuple[List[Fix | None], ...] = tuple([] for _ in SEVERITY_LEVELS)
+
+    for stage in _PREVIEW_STAGES:
+        stage(loot_table, validation_result, buckets, level)
+
+    applicable_fixes = [fix for bucket in buckets[:level] for fix in bucket]
+    warnings = validation_result.get("warnings", [])
+
+    return {
+        "profile": profile,
+        "would_apply": len(applicable_fixes) > 0,
+        "summary": {
+            "total_detected_issues": sum(len(bucket) for bucket in buckets),
+            "applicable_fixes": len(applicable_fixes),
+        },
+        "fixes": applicable_fixes,
+        "warnings": [w.get("message", "") for w in warnings],
+    }
+
+
+def _validation_fixes(
+    loot_table: Dict[str, Any],
+    validation_result: Dict[str, Any],
+    buckets: Tuple[List[Fix | None], ...],
+    level: int,
+) -> None:
+    """
+    Fixes derived from validator errors/warnings.
+    SAFE clamps plus the AGGRESSIVE rarity-mismatch rule.
+    """
+    safe_fixes = buckets[_SEV_SAFE]
+    aggressive_fixes = buckets[_SEV_AGGRESSIVE]
+    emit_aggressive = level > _SEV_AGGRESSIVE
+
     warnings = validation_result.get("warnings", [])
     errors = validation_result.get("errors", [])
 
@@ -168,51 +422,62 @@ def generate_autocorrect_preview(
     # SAFE fixes
     # --------------------------------------------------
 
-    # Clamp invalid or missing drop.weight
+    # Single pass over errors: clamp drop.weight (SAFE) and
+    # rarity-vs-container mismatches (AGGRESSIVE)
     for err in errors:
         msg = err.get("message", "")
         path = err.get("path", "")
-        if "drop.weight" in msg:
-            fixes.append({
-                "path": path,
-                "issue": msg,
-                "before": "invalid or < 1",
-                "after": 1,
-                "action": "Clamp drop.weight to minimum of 1",
-                "severity": "safe",
-            })
+        if msg.startswith(_DROP_WEIGHT_PREFIX):
+            safe_fixes.append(Fix(
+                path=path,
+                issue=msg,
+                before="invalid or < 1",
+                after=1,
+                action="Clamp drop.weight to minimum of 1",
+                severity="safe",
+                op="clamp_weight",
+                addr=_parse_path(path),
+            ))
+        elif _RARITY_MATCH_MARKER in msg:
+            aggressive_fixes.append(Fix(
+                path=path,
+                issue=msg,
+                before="item.rarity != container rarity",
+                after="container rarity",
+                action="Normalize item.rarity to container rarity",
+                severity="aggressive",
+            ) if emit_aggressive else None)
 
     # Missing optional tags
     for warn in warnings:
         msg = warn.get("message", "")
         path = warn.get("path", "")
-        if "Missing optional field 'tags'" in msg:
-            fixes.append({
-                "path": path,
-                "issue": "Missing tags",
-                "before": None,
-                "after": [],
-                "action": "Add empty tags list",
-                "severity": "safe",
-            })
+        if msg.startswith(_MISSING_TAGS_PREFIX):
+            safe_fixes.append(Fix(
+                path=path,
+                issue="Missing tags",
+                before=None,
+                after=[],
+                action="Add empty tags list",
+                severity="safe",
+                op="add_tags",
+                addr=_parse_path(path),
+            ))
 
     # --------------------------------------------------
     # AGGRESSIVE fixes (Phase 1–3 placeholders already exist in your project)
     # Keep your earlier aggressive rules above/below as needed.
     # --------------------------------------------------
 
-    for err in errors:
-        msg = err.get("message", "")
-        path = err.get("path", "")
-        if "must match container rarity" in msg:
-            fixes.append({
-                "path": path,
-                "issue": msg,
-                "before": "item.rarity != container rarity",
-                "after": "container rarity",
-                "action": "Normalize item.rarity to container rarity",
-                "severity": "aggressive",
-            })
+
+def _unknown_rarity_fixes(
+    loot_table: Dict[str, Any],
+    validation_result: Dict[str, Any],
+    buckets: Tuple[List[Fix | None], ...],
+    level: int,
+) -> None:
+    strict_fixes = buckets[_SEV_STRICT]
+    emit_strict = level > _SEV_STRICT
 
     # --------------------------------------------------
     # STRICT fixes (preview only)
@@ -221,128 +486,142 @@ def generate_autocorrect_preview(
     summary = validation_result.get("summary", {})
     unknown_rarities = summary.get("unknown_rarity_counts", {})
     for rarity, count in unknown_rarities.items():
-        fixes.append({
-            "path": "$",
-            "issue": f"Unknown rarity '{rarity}' used {count} times",
-            "before": rarity,
-            "after": None,
-            "action": "Reject or remove items with unknown rarity",
-            "severity": "strict",
-        })
+        strict_fixes.append(Fix(
+            path="$",
+            issue=f"Unknown rarity '{rarity}' used {count} times",
+            before=rarity,
+            after=None,
+            action="Reject or remove items with unknown rarity",
+            severity="strict",
+        ) if emit_strict else None)
+
+
+def _progression_fixes(
+    loot_table: Dict[str, Any],
+    validation_result: Dict[str, Any],
+    buckets: Tuple[List[Fix | None], ...],
+    level: int,
+) -> None:
+    aggressive_fixes = buckets[_SEV_AGGRESSIVE]
+    emit_aggressive = level > _SEV_AGGRESSIVE
 
     # ==================================================
     # AGGRESSIVE PHASE 4: Progression & Economy Signals
     # Preview-only diagnostics (no apply/export)
     # ==================================================
 
-    # Collect per-rarity stats, tags, weights
-    rarity_power: Dict[str, List[float]] = {r: [] for r in RARITY_ORDER}
-    rarity_weights: Dict[str, List[int]] = {r: [] for r in RARITY_ORDER}
-    rarity_tag_sets: Dict[str, set] = {r: set() for r in RARITY_ORDER}
-    rarity_stat_keys: Dict[str, set] = {r: set() for r in RARITY_ORDER}
-
-    total_weight_all = 0
-    total_weight_by_rarity: Dict[str, int] = {r: 0 for r in RARITY_ORDER}
+    # Single pass, parallel columns (SoA) keyed on an integer tier index
+    rar_idx: List[int] = []
+    powers: List[float] = []
+    weights: List[int] = []
+    tag_sets: List[set] = [set() for _ in RARITY_ORDER]
+    stat_key_sets: List[set] = [set() for _ in RARITY_ORDER]
 
     for cat, typ, rarity, idx, item in _iter_items(loot_table):
-        if rarity not in rarity_power:
+        r = RARITY_INDEX.get(rarity)
+        if r is None:
             # Ignore custom tiers for phase 4 metrics
             continue
 
-        p = _power_score(item)
-        w = _safe_weight(item)
+        rar_idx.append(r)
+        powers.append(_power_score(item))
+        weights.append(_safe_weight(item))
 
-        rarity_power[rarity].append(p)
-        rarity_weights[rarity].append(w)
-
-        total_weight_all += max(0, w)
-        total_weight_by_rarity[rarity] += max(0, w)
-
-        tags = item.get("tags", [])
+        tags = item.get("tags", EMPTY_TAGS)
         if isinstance(tags, list):
+            tag_set = tag_sets[r]
             for t in tags:
                 if isinstance(t, str):
-                    rarity_tag_sets[rarity].add(t)
+                    tag_set.add(t)
 
-        stats = item.get("stats", {})
+        stats = item.get("stats", EMPTY_STATS)
         if isinstance(stats, dict):
+            key_set = stat_key_sets[r]
             for k in stats.keys():
                 if isinstance(k, str):
-                    rarity_stat_keys[rarity].add(k)
+                    key_set.add(k)
+
+    # All numeric aggregation in one array kernel
+    power_sums, counts, tier_weight, raw_weight, dominance = _phase4_kernel(
+        np.asarray(rar_idx, dtype=np.intp),
+        np.asarray(powers, dtype=np.float64),
+        np.asarray(weights, dtype=np.int64),
+        len(RARITY_ORDER),
+    )
+
+    total_weight_all = sum(int(w) for w in tier_weight)
+
+    rarity_tag_sets: Dict[str, set] = dict(zip(RARITY_ORDER, tag_sets))
+    rarity_stat_keys: Dict[str, set] = dict(zip(RARITY_ORDER, stat_key_sets))
 
     # ---- Phase 4 Rule 1: Power Inflation Curve (avg power should rise by tier) ----
     # Only evaluate if we have enough data points to be meaningful
-    avg_power: Dict[str, float] = {}
-    for r in RARITY_ORDER:
-        vals = rarity_power[r]
-        if vals:
-            avg_power[r] = round(sum(vals) / max(1, len(vals)), 4)
-        else:
-            avg_power[r] = 0.0
-
-    # Require each tier to be meaningfully >= previous (tolerance)
-    # Tunable threshold: 10% lift between tiers (indie-friendly default)
-    lift = 1.10
-    for i in range(1, len(RARITY_ORDER)):
+    avg_list: List[float] = [
+        round(float(power_sums[i]) / int(counts[i]), 4) if counts[i] else 0.0
+        for i in range(len(RARITY_ORDER))
+    ]
+    avg = np.asarray(avg_list)
+
+    # Require each tier to be meaningfully >= previous (tolerance).
+    # prev > 0 also skips tiers where stats are missing across the board.
+    lift = _PROGRESSION_LIFT
+    weak = (avg[:-1] > 0) & (avg[1:] < avg[:-1] * lift)
+    for i in (np.flatnonzero(weak) + 1).tolist():
         prev_r = RARITY_ORDER[i - 1]
         cur_r = RARITY_ORDER[i]
-        prev_val = avg_power.get(prev_r, 0.0)
-        cur_val = avg_power.get(cur_r, 0.0)
-
-        # If stats are missing across the board, don't spam
-        if prev_val == 0.0 and cur_val == 0.0:
-            continue
-
-        if prev_val > 0 and cur_val < prev_val * lift:
-            fixes.append({
-                "path": "$",
-                "issue": f"Progression curve weak: avg {cur_r} power ({cur_val}) is not at least {int((lift-1)*100)}% above {prev_r} ({prev_val}).",
-                "before": {"avg_power": {prev_r: prev_val, cur_r: cur_val}},
-                "after": f"Increase {cur_r} stats or reduce {prev_r} stats/weights to create clearer progression.",
-                "action": f"Adjust stat curve so {cur_r} is meaningfully stronger than {prev_r}.",
-                "severity": "aggressive",
-            })
+        prev_val = avg_list[i - 1]
+        cur_val = avg_list[i]
+
+        aggressive_fixes.append(Fix(
+            path="$",
+            issue=f"Progression curve weak: avg {cur_r} power ({cur_val}) is not at least {int((lift-1)*100)}% above {prev_r} ({prev_val}).",
+            before={"avg_power": {prev_r: prev_val, cur_r: cur_val}},
+            after=f"Increase {cur_r} stats or reduce {prev_r} stats/weights to create clearer progression.",
+            action=f"Adjust stat curve so {cur_r} is meaningfully stronger than {prev_r}.",
+            severity="aggressive",
+        ) if emit_aggressive else None)
 
     # ---- Phase 4 Rule 2: Legendary not meaningfully stronger than Epic ----
-    epic = avg_power.get("Epic", 0.0)
-    leg = avg_power.get("Legendary", 0.0)
-    if epic > 0 and leg > 0 and leg < epic * 1.10:
-        fixes.append({
-            "path": "$",
-            "issue": f"Legendary power may feel unrewarding: avg Legendary ({leg}) is < 10% above avg Epic ({epic}).",
-            "before": {"avg_power": {"Epic": epic, "Legendary": leg}},
-            "after": "Increase Legendary stats or reduce Epic stats for clearer payoff.",
-            "action": "Increase Legendary stat deltas vs Epic (or reduce Epic power).",
-            "severity": "aggressive",
-        })
+    epic = avg_list[_EPIC]
+    leg = avg_list[_LEGENDARY]
+    if epic > 0 and leg > 0 and leg < epic * _LEGENDARY_LIFT:
+        aggressive_fixes.append(Fix(
+            path="$",
+            issue=f"Legendary power may feel unrewarding: avg Legendary ({leg}) is < 10% above avg Epic ({epic}).",
+            before={"avg_power": {"Epic": epic, "Legendary": leg}},
+            after="Increase Legendary stats or reduce Epic stats for clearer payoff.",
+            action="Increase Legendary stat deltas vs Epic (or reduce Epic power).",
+            severity="aggressive",
+        ) if emit_aggressive else None)
 
     # ---- Phase 4 Rule 3: Early Legendary Risk (legendary weight share) ----
     if total_weight_all > 0:
-        leg_share = (total_weight_by_rarity.get("Legendary", 0) / total_weight_all) * 100
+        leg_share = (int(tier_weight[_LEGENDARY]) / total_weight_all) * 100
         # Tunable: > 1.0% of total weight is often too generous for legendaries
-        if leg_share > 1.0:
-            fixes.append({
-                "path": "$",
-                "issue": f"Early Legendary risk: Legendary weight share is {round(leg_share, 3)}% of total pool (often too high).",
-                "before": {"legendary_weight_share_percent": round(leg_share, 3)},
-                "after": "Reduce Legendary weights or increase lower-tier weights to preserve progression.",
-                "action": "Reduce Legendary drop weights (or gate Legendary behind progression).",
-                "severity": "aggressive",
-            })
+        if leg_share > _LEGENDARY_SHARE_MAX:
+            aggressive_fixes.append(Fix(
+                path="$",
+                issue=f"Early Legendary risk: Legendary weight share is {round(leg_share, 3)}% of total pool (often too high).",
+                before={"legendary_weight_share_percent": round(leg_share, 3)},
+                after="Reduce Legendary weights or increase lower-tier weights to preserve progression.",
+                action="Reduce Legendary drop weights (or gate Legendary behind progression).",
+                severity="aggressive",
+            ) if emit_aggressive else None)
 
     # ---- Phase 4 Rule 4: Loot Fatigue / Weight Concentration (dominance) ----
     # If top 5 items account for too much of a tier's weight, players see repeats.
-    for r in RARITY_ORDER:
-        dominance = _weight_concentration(rarity_weights[r])
-        if dominance >= 0.50 and sum(rarity_weights[r]) > 0:
-            fixes.append({
-                "path": "$",
-                "issue": f"Loot fatigue risk in {r}: top-weight items dominate {round(dominance*100, 2)}% of tier weight.",
-                "before": {"dominance_percent": round(dominance * 100, 2), "rarity": r},
-                "after": "Spread weights more evenly; add more items; reduce top-item weights.",
-                "action": f"Reduce top weights in {r} or add more comparable items to increase variety.",
-                "severity": "aggressive",
-            })
+    fatigued = (dominance >= _DOMINANCE_MAX) & (raw_weight > 0)
+    for i in np.flatnonzero(fatigued).tolist():
+        r = RARITY_ORDER[i]
+        tier_dominance = float(dominance[i])
+        aggressive_fixes.append(Fix(
+            path="$",
+            issue=f"Loot fatigue risk in {r}: top-weight items dominate {round(tier_dominance*100, 2)}% of tier weight.",
+            before={"dominance_percent": round(tier_dominance * 100, 2), "rarity": r},
+            after="Spread weights more evenly; add more items; reduce top-item weights.",
+            action=f"Reduce top weights in {r} or add more comparable items to increase variety.",
+            severity="aggressive",
+        ) if emit_aggressive else None)
 
     # ---- Phase 4 Rule 5: Rarity Purpose Check (new mechanics/tags/stats keys) ----
     # Higher tiers should introduce *something* new (tags or stat keys).
@@ -357,64 +636,56 @@ def generate_autocorrect_preview(
 
         # If tier exists but adds nothing new vs prev
         if cur_tags and prev_tags and cur_tags.issubset(prev_tags) and cur_keys.issubset(prev_keys):
-            fixes.append({
-                "path": "$",
-                "issue": f"{cur_r} may lack unique identity: tags/stats keys are not introducing new mechanics vs {prev_r}.",
-                "before": {
+            aggressive_fixes.append(Fix(
+                path="$",
+                issue=f"{cur_r} may lack unique identity: tags/stats keys are not introducing new mechanics vs {prev_r}.",
+                before={
                     "prev_rarity": prev_r,
                     "cur_rarity": cur_r,
                     "new_tags_count": len(cur_tags - prev_tags),
                     "new_stat_keys_count": len(cur_keys - prev_keys),
                 },
-                "after": f"Introduce new tags or stat mechanics in {cur_r} to justify tier progression.",
-                "action": f"Add unique tags and/or new stat keys to {cur_r} items (tier identity).",
-                "severity": "aggressive",
-            })
+                after=f"Introduce new tags or stat mechanics in {cur_r} to justify tier progression.",
+                action=f"Add unique tags and/or new stat keys to {cur_r} items (tier identity).",
+                severity="aggressive",
+            ) if emit_aggressive else None)
 
-    # --------------------------------------------------
-    # Filter fixes by profile severity
-    # --------------------------------------------------
 
-    allowed_level = SEVERITY_LEVELS[profile]
-
-    applicable_fixes = [
-        fix for fix in fixes
-        if SEVERITY_LEVELS[fix["severity"]] <= allowed_level
-    ]
-
-    return {
-        "profile": profile,
-        "would_apply": len(applicable_fixes) > 0,
-        "summary": {
-            "total_detected_issues": len(fixes),
-            "applicable_fixes": len(applicable_fixes),
-        },
-        "fixes": applicable_fixes,
-        "warnings": [w.get("message", "") for w in warnings],
-    }
+# Preview stages in emit order; stage order fixes the order of fixes
+# within each bucket.
+_PREVIEW_STAGES = (
+    _validation_fixes,
+    _unknown_rarity_fixes,
+    _progression_fixes,
+)
 
 
 # ============================================================
 # Diff Builder (Preview → Diff-Only Output)
 # ============================================================
 
-def build_autocorrect_diff(preview: Dict[str, Any]) -> Dict[str, Any]:
-    diffs: List[Dict[str, Any]] = []
-
+def iter_diffs(preview: Dict[str, Any]) -> Iterator[Dict[str, Any]]:
+    """
+    Lazily yields one diff entry per preview fix (for streaming writers).
+    """
     for fix in preview.get("fixes", []):
-        diffs.append({
-            "path": fix.get("path"),
-            "severity": fix.get("severity"),
-            "issue": fix.get("issue"),
-            "before": fix.get("before"),
-            "after": fix.get("after"),
-            "action": fix.get("action"),
-        })
+        yield {
+            "path": fix.path,
+            "severity": fix.severity,
+            "issue": fix.issue,
+            "before": _fresh(fix.before),
+            "after": _fresh(fix.after),
+            "action": fix.action,
+        }
+
+
+def build_autocorrect_diff(preview: Dict[str, Any]) -> Dict[str, Any]:
+    fixes = preview.get("fixes", [])
 
     return {
         "profile": preview.get("profile"),
-        "diff_count": len(diffs),
-        "diffs": diffs,
+        "diff_count": len(fixes),
+        "diffs": list(iter_diffs(preview)),
     }
 
 
@@ -429,14 +700,44 @@ def apply_autocorrect(
     """
     Applies SAFE auto-correct fixes from a preview to a COPY of the loot table.
     Only fixes explicitly listed in the preview are applied.
-    """
-    table = deepcopy(loot_table)
 
+    Copy-on-write: only the containers on the path to a fixed item are
+    copied, every untouched subtree is shared with the input table.
+    """
+    # Group safe fixes by rarity list, then by item index
+    # (addr is resolved when the fix is built: no path parsing here)
+    targets: Dict[Tuple[str, str, str], Dict[int, List[Fix]]] = {}
     for fix in preview.get("fixes", []):
-        if fix.get("severity") != "safe":
+        if fix.severity != "safe":
             continue
 
-        _apply_single_fix(table, fix)
+        addr = fix.addr
+        if addr is None:
+            continue
+        targets.setdefault(addr[:3], {}).setdefault(addr[3], []).append(fix)
+
+    table = dict(loot_table)
+    copied: set = set()
+
+    # Resolve + copy each rarity list once, then patch its items in a tight loop
+    for bucket_addr, by_index in targets.items():
+        try:
+            bucket = _cow_bucket(table, bucket_addr, copied)
+        except (KeyError, TypeError):
+            continue
+
+        for idx, item_fixes in by_index.items():
+            try:
+                item = bucket[idx]
+            except IndexError:
+                continue
+            if not isinstance(item, dict):
+                continue
+
+            item = dict(item)
+            bucket[idx] = item
+            for fix in item_fixes:
+                _apply_single_fix(item, fix)
 
     return table
 
@@ -445,56 +746,89 @@ def apply_autocorrect(
 # Internal Fix Handlers
 # ============================================================
 
-def _apply_single_fix(table: Dict[str, Any], fix: Dict[str, Any]) -> None:
-    action = fix.get("action", "")
-    path = fix.get("path", "")
+_ITEM_PATH_RE = re.compile(r"\$\.([^.]+)\.([^.]+)\.([^.\[]+)\[(\d+)\]")
 
-    if "Clamp drop.weight" in action:
-        _apply_weight_clamp(table, path)
 
-    if "Add empty tags list" in action:
-        _apply_missing_tags(table, path)
+@lru_cache(maxsize=4096)
+def _parse_path(path: str) -> Tuple[str, str, str, int] | None:
+    """
+    "$.cat.type.rarity[idx](.field...)" -> (cat, type, rarity, idx)
+    Returns None for paths that don't point at an item.
+    Memoized: previews repeat the same item paths across fixes and calls.
+    """
+    m = _ITEM_PATH_RE.match(path)
+    if m is None:
+        return None
+    category, item_type, rarity, idx = m.groups()
+    return category, item_type, rarity, int(idx)
+
+
+def _cow_bucket(
+    table: Dict[str, Any],
+    bucket_addr: Tuple[str, str, str],
+    copied: set,
+) -> List[Any]:
+    """
+    Walks category -> type -> rarity list, shallow-copying each container
+    the first time it is reached so the input table is never mutated.
+    Returns the (copied) rarity list.
+    """
+    node: Any = table
+    last = len(bucket_addr) - 1
+    for depth, key in enumerate(bucket_addr):
+        child = node[key]
+        prefix = bucket_addr[:depth + 1]
 
+        if prefix not in copied:
+            if depth < last and isinstance(child, dict):
+                child = dict(child)
+            elif depth == last and isinstance(child, list):
+                child = list(child)
+            else:
+                raise TypeError(f"Unexpected node at {prefix}")
+            node[key] = child
+            copied.add(prefix)
 
-def _apply_weight_clamp(table: Dict[str, Any], path: str) -> None:
-    try:
-        parts = path.replace("$.", "").split(".")
-        category, item_type, rarity_idx = parts[0], parts[1], parts[2]
+        node = child
 
-        rarity, idx = rarity_idx.split("[")
-        idx = int(idx.rstrip("]"))
+    return node
 
-        item = table[category][item_type][rarity][idx]
-        drop = item.setdefault("drop", {})
 
-        weight = drop.get("weight")
-        if not isinstance(weight, int) or weight < 1:
-            drop["weight"] = 1
+def _apply_single_fix(item: Dict[str, Any], fix: Fix) -> None:
+    handler = FIX_HANDLERS.get(fix.op)
+    if handler is not None:
+        handler(item)
 
-    except Exception:
-        return
 
+def _apply_weight_clamp(item: Dict[str, Any]) -> None:
+    drop = item.get("drop", {})
+    if not isinstance(drop, dict):
+        return
 
-def _apply_missing_tags(table: Dict[str, Any], path: str) -> None:
-    try:
-        parts = path.replace("$.", "").split(".")
-        category, item_type, rarity_idx = parts[0], parts[1], parts[2]
+    weight = drop.get("weight")
+    if not isinstance(weight, int) or weight < 1:
+        # copy drop too, it is still shared with the input table
+        item["drop"] = {**drop, "weight": 1}
 
-        rarity, idx = rarity_idx.split("[")
-        idx = int(idx.rstrip("]"))
 
-        item = table[category][item_type][rarity][idx]
+def _apply_missing_tags(item: Dict[str, Any]) -> None:
+    if "tags" not in item:
+        item["tags"] = []
 
-        if "tags" not in item:
-            item["tags"] = []
 
-    except Exception:
-        return
+# Fix.op -> handler; new safe fixes register here
+FIX_HANDLERS = {
+    "clamp_weight": _apply_weight_clamp,
+    "add_tags": _apply_missing_tags,
+}
 
 
 # ============================================================
 # Capability Helper
 # ============================================================
 
-def get_profile_capabilities(profile: str) -> Dict[str, Any]:
+def get_profile_capabilities(profile: str) -> Mapping[str, Any]:
+    """
+    Read-only view of a profile's capabilities (falls back to SAFE).
+    """
     return PROFILE_CAPABILITIES.get(profile, PROFILE_CAPABILITIES["safe"])
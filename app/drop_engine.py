@@ -1,88 +1,422 @@
+import bisect
+import warnings
+from collections import OrderedDict
+from threading import Lock
+
+import numpy as np
+
+from app.alias import build_alias, sample_alias
+
+__all__ = [
+    "build_pool",
+    "build_pool_indices",
+    "precompute_pools",
+    "roll_from_items",
+    "simulate_drop_indices",
+    "simulate_drops",
+    "summarize_draws",
+    "fold_draws",
+    "tally",
+    "tally_codes",
+    "luck_weights",
+    "roll_with_luck",
+]
+
+
 def build_pool(items):
-    pool = []
-    for item in items:
-        pool.extend([item] * item["drop"]["weight"])
-    return pool
+    """
+    Deprecated: materializes sum(weights) references.
+    Sampling uses cumulative weights (_cumulative) instead.
+    """
+    warnings.warn(
+        "build_pool is deprecated; rolls sample cumulative weights directly",
+        DeprecationWarning,
+        stacklevel=2,
+    )
+    return [items[i] for i in build_pool_indices(items).tolist()]
+
+
+def _weights(items):
+    """
+    Drop weights as int64; weights <= 0 clamp to 0 (never drop).
+    """
+    weights = np.fromiter(
+        (item["drop"]["weight"] for item in items),
+        dtype=np.int64,
+        count=len(items),
+    )
+    np.maximum(weights, 0, out=weights)
+    return weights
+
+
+def build_pool_indices(items):
+    """
+    Compact weighted pool: item index repeated `weight` times (int32).
+    Index into `items` lazily, e.g. items[pool[rng.integers(pool.size)]].
+    """
+    weights = _weights(items)
+    return np.repeat(np.arange(len(items), dtype=np.int32), weights)
+
+
+def _cumulative(items, weights=None):
+    """
+    Running weight totals for binary-search sampling.
+    Weights <= 0 never drop (same as the old expanded pool).
+    `weights` overrides item["drop"]["weight"] (e.g. luck_weights()).
+    """
+    if weights is None:
+        weights = _weights(items)
+    else:
+        weights = np.maximum(np.asarray(weights, dtype=np.int64), 0)
+    cum = np.cumsum(weights)
+    total = int(cum[-1]) if cum.size else 0
+    return cum, total
+
+
+# Largest total weight that gets an owner lookup table (int32 entries)
+_LOOKUP_MAX = 1 << 20
+# Build a throwaway lookup when total <= this many draws' worth: np.repeat
+# costs ~1ns per weight unit vs ~80ns per binary search on a big batch
+_LOOKUP_PER_DRAW = 32
 
 
-def roll_from_items(items, rng):
-    pool = build_pool(items)
-    if not pool:
+def _lookup(cum, total):
+    """
+    Owner table: lookup[r] is the position whose cumulative-weight bucket
+    holds r, i.e. searchsorted(cum, r, "right") as an O(1) gather.
+    None when the pool is too heavy to tabulate.
+    """
+    if total <= 0 or total > _LOOKUP_MAX:
+        return None
+    counts = np.diff(cum, prepend=0)
+    return np.repeat(np.arange(cum.size, dtype=np.int32), counts)
+
+
+# id(pool) -> (pool, cum, total, lookup) for long-lived pools registered up
+# front. Keyed on list identity; the stored ref pins the id. Startup only.
+_pool_cumulative = {}
+
+
+def precompute_pools(pools):
+    """
+    Build and keep cumulative weights (and an owner lookup table) for pools
+    sampled over and over, e.g. the startup indexes, so rolls on them skip
+    the per-item weight walk and draw in O(1).
+    Registered pools must not have their items or weights changed afterwards;
+    pass weights= to sample a variation instead.
+    """
+    for items in pools:
+        cum, total = _cumulative(items)
+        _pool_cumulative[id(items)] = (items, cum, total, _lookup(cum, total))
+
+
+# id(pool) -> (pool, cum, total, cum_list) for ad-hoc pools (tag filters,
+# caller-built lists), so repeat rolls skip the weight walk. LRU on list
+# identity like the luck cache; cum_list feeds bisect for single rolls.
+_ADHOC_CACHE_SIZE = 64
+_adhoc_cumulative: "OrderedDict[int, tuple]" = OrderedDict()
+_adhoc_cumulative_lock = Lock()
+
+
+def _adhoc_weights(items):
+    key = id(items)
+    with _adhoc_cumulative_lock:
+        hit = _adhoc_cumulative.get(key)
+        if hit is not None and hit[0] is items:
+            _adhoc_cumulative.move_to_end(key)
+            return hit
+
+    cum, total = _cumulative(items)
+    cum.flags.writeable = False
+    entry = (items, cum, total, cum.tolist())
+    with _adhoc_cumulative_lock:
+        # the pool ref keeps id(items) from being reused while cached
+        _adhoc_cumulative[key] = entry
+        if len(_adhoc_cumulative) > _ADHOC_CACHE_SIZE:
+            _adhoc_cumulative.popitem(last=False)
+    return entry
+
+
+def _pool_weights(items, weights=None):
+    """
+    (cum, total, lookup) for a roll: precomputed when `items` is a
+    registered pool, otherwise cached per pool with no lookup table
+    (built now and not kept when `weights` is given).
+    """
+    if weights is not None:
+        return (*_cumulative(items, weights), None)
+    hit = _pool_cumulative.get(id(items))
+    if hit is not None and hit[0] is items:
+        return hit[1:]
+    return (*_adhoc_weights(items)[1:3], None)
+
+
+def _sample(cum, total, u, lookup=None):
+    """
+    Map uniforms u in [0, 1) to item positions: the position whose
+    cumulative-weight bucket holds int(u * total). Scales `u` in place.
+    """
+    np.multiply(u, total, out=u)
+    draws = u.astype(np.int64)
+    if lookup is not None:
+        return lookup[draws]
+    return np.searchsorted(cum, draws, side="right")
+
+
+def _roll_index(items, rng, weights=None):
+    if weights is None:
+        hit = _pool_cumulative.get(id(items))
+        if hit is None or hit[0] is not items:
+            # one draw: bisect on a plain list beats a NumPy call's overhead
+            _, _, total, cum_list = _adhoc_weights(items)
+            if total <= 0:
+                raise ValueError("Loot pool is empty")
+            return bisect.bisect(cum_list, int(rng.random() * total))
+
+    cum, total, lookup = _pool_weights(items, weights)
+    if total <= 0:
         raise ValueError("Loot pool is empty")
-    return rng.choice(pool)
-
-
-def extract_all_items(loot_table):
-    all_items = []
-    for category in loot_table.values():
-        for item_type in category.values():
-            for rarity_items in item_type.values():
-                all_items.extend(rarity_items)
-    return all_items
-
-
-def extract_items_by_tag(loot_table, tag: str):
-    results = []
-    for category in loot_table.values():
-        for item_type in category.values():
-            for rarity_items in item_type.values():
-                for item in rarity_items:
-                    if tag in item.get("tags", []):
-                        results.append(item)
-    return results
-
-
-def extract_items_by_tags(loot_table, tags: list[str]):
-    results = []
-    for category in loot_table.values():
-        for item_type in category.values():
-            for rarity_items in item_type.values():
-                for item in rarity_items:
-                    item_tags = set(item.get("tags", []))
-                    if all(tag in item_tags for tag in tags):
-                        results.append(item)
-    return results
-
-def simulate_drops(items, rng, simulations: int):
-    results = []
-    
-    for _ in range(simulations):
-        pool = []
-        for item in items:
-            pool.extend([item] * item["drop"]["weight"])
-        results.append(rng.choice(pool))
-        
-    return results
-
-def apply_luck(items, luck: float):
-    """
-    Adjusts drop weights based on luck.
-    Higher rarity benefits more, but nothing is guaranteed.
-    """
-    
+    r = int(rng.random() * total)
+    if lookup is not None:
+        return int(lookup[r])
+    return int(np.searchsorted(cum, r, side="right"))
+
+
+def roll_from_items(items, rng, weights=None):
+    return items[_roll_index(items, rng, weights)]
+
+
+def simulate_drop_indices(items, rng, simulations: int, weights=None, luck: float = 0.0):
+    """
+    Positions into `items` for `simulations` weighted rolls, as an int array.
+    Callers that only aggregate should count these (np.bincount / tally())
+    rather than materializing simulate_drops()' item list.
+    `luck` > 0 (without `weights`) samples luck_weights(items, luck) through
+    a per-(pool, luck) cache of its cumulative and lookup tables.
+    """
+    # Weights are fixed across the run: build the cumulative table once,
+    # then draw every roll in one vectorized searchsorted. Same sampling as
+    # Generator.choice(p=...) but on exact integer weights (no float p vector).
+    if weights is None and luck > 0:
+        _, _, cum, total, lookup, _ = _luck_pool(items, luck)
+    else:
+        cum, total, lookup = _pool_weights(items, weights)
+    if total <= 0:
+        raise ValueError("Loot pool is empty")
+    if lookup is None and total <= _LOOKUP_PER_DRAW * simulations:
+        lookup = _lookup(cum, total)
+
+    if lookup is None and simulations >= cum.size:
+        # too heavy to tabulate: an O(n) alias build still beats a binary
+        # search per draw once the run is at least as long as the pool
+        prob, alias = build_alias(np.diff(cum, prepend=0))
+        return sample_alias(prob, alias, rng.random(simulations))
+    return _sample(cum, total, rng.random(simulations), lookup)
+
+
+def simulate_drops(items, rng, simulations: int, weights=None):
+    """
+    Item dicts for `simulations` rolls. Only for callers that need every
+    drop as an object; aggregation should use simulate_drop_indices().
+    """
+    idx = simulate_drop_indices(items, rng, simulations, weights)
+    return [items[i] for i in idx.tolist()]
+
+
+def _codes(labels):
+    """
+    (codes, names): small int code per label, codes in first-seen order.
+    """
+    codebook = {}
+    codes = np.fromiter(
+        (codebook.setdefault(label, len(codebook)) for label in labels),
+        dtype=np.intp,
+        count=len(labels),
+    )
+    return codes, list(codebook)
+
+
+def tally(labels, idx, summary=None):
+    """
+    {label: count} over drawn positions `idx`, where labels[i] labels items[i].
+    Keys come out in first-drawn order, matching a dict-increment loop over
+    the drops, but the per-drop work is a single bincount.
+    """
+    return tally_codes(*_codes(labels), idx, summary)
+
+
+def summarize_draws(idx, size: int):
+    """
+    The only per-draw pass an aggregation needs: (idx, counts, first, last)
+    with, per pool position, how often it was drawn and the draw numbers of
+    its first and last hit (size / -1 when never drawn). Every tally below
+    then folds these pool-sized arrays instead of re-reading the draws.
+    """
+    idx = np.asarray(idx)
+    order = np.arange(idx.size)
+    counts = np.bincount(idx, minlength=size)
+    first = np.full(size, idx.size, dtype=np.intp)
+    np.minimum.at(first, idx, order)
+    last = np.full(size, -1, dtype=np.intp)
+    np.maximum.at(last, idx, order)
+    return idx, counts, first, last
+
+
+def fold_draws(codes, size: int, summary):
+    """
+    summarize_draws() regrouped by label code (codes[i] for pool position i,
+    all < size): (counts, first, last) per code, where first/last are draw
+    numbers as in the summary (never-drawn codes: huge / -1).
+    """
+    _, counts, first, last = summary
+    code_counts = np.bincount(codes, weights=counts, minlength=size).astype(np.int64)
+    code_first = np.full(size, np.iinfo(np.intp).max, dtype=np.intp)
+    np.minimum.at(code_first, codes, first)
+    code_last = np.full(size, -1, dtype=np.intp)
+    np.maximum.at(code_last, codes, last)
+    return code_counts, code_first, code_last
+
+
+# up to this many distinct labels, tally_codes() without a shared summary
+# counts the gathered codes instead of summarizing every pool position
+_FEW_LABELS = 16
+
+
+def tally_codes(codes, names, idx, summary=None):
+    """
+    tally() for labels already encoded as ints: codes[i] is the code of
+    items[i] and names[code] its label (e.g. indexes.rarity_codes()).
+    `summary` (summarize_draws(idx, len(codes))) shares one pass over the
+    draws between several tallies of the same run.
+    """
+    if summary is None and len(names) <= _FEW_LABELS:
+        # a handful of labels (rarity tiers): gather the drawn codes and
+        # count them directly; first draws are one short scan per label
+        drawn = np.asarray(codes)[idx]
+        code_counts = np.bincount(drawn, minlength=len(names))
+        seen = np.flatnonzero(code_counts)
+        code_first = np.array([(drawn == code).argmax() for code in seen.tolist()])
+        order = seen[np.argsort(code_first)]
+    else:
+        summary = summary or summarize_draws(idx, len(codes))
+        code_counts, code_first, _ = fold_draws(codes, len(names), summary)
+        seen = np.flatnonzero(code_counts)
+        order = seen[np.argsort(code_first[seen])]
+
+    return {names[code]: int(code_counts[code]) for code in order.tolist()}
+
+
+# Luck bonus per rarity: multiplier = 1.0 + luck * coef (unknown tiers: 0)
+_LUCK_COEF = {
+    "Common": 0.0,
+    "Uncommon": 0.25,
+    "Rare": 0.5,
+    "Epic": 0.75,
+    "Legendary": 1.0,
+}
+
+
+_LUCK_CACHE_SIZE = 64
+_luck_cache: "OrderedDict[int, tuple]" = OrderedDict()
+_luck_cache_lock = Lock()
+
+
+def _luck_basis(items):
+    """
+    (raw weights, luck coefficients) for a pool, cached on list identity.
+    Independent of the luck value, so every luck level reuses one entry.
+    Arrays are read-only: they are shared across requests.
+    """
+    key = id(items)
+    with _luck_cache_lock:
+        hit = _luck_cache.get(key)
+        if hit is not None and hit[0] is items:
+            _luck_cache.move_to_end(key)
+            return hit[1], hit[2]
+
+    weights = np.fromiter(
+        (item["drop"]["weight"] for item in items),
+        dtype=np.int64,
+        count=len(items),
+    )
+    coef = np.fromiter(
+        (_LUCK_COEF.get(item["rarity"], 0.0) for item in items),
+        dtype=np.float64,
+        count=len(items),
+    )
+    weights.flags.writeable = False
+    coef.flags.writeable = False
+
+    with _luck_cache_lock:
+        # the pool ref keeps id(items) from being reused while cached
+        _luck_cache[key] = (items, weights, coef)
+        if len(_luck_cache) > _LUCK_CACHE_SIZE:
+            _luck_cache.popitem(last=False)
+
+    return weights, coef
+
+
+def luck_weights(items, luck: float):
+    """
+    Luck-adjusted drop weights as an int64 array parallel to `items`.
+    Feed to roll_from_items/simulate_drops(weights=...) to skip re-building items.
+    Pools are read through a per-pool cache, so they must not change
+    weights in place between calls.
+    """
+    weights, coef = _luck_basis(items)
     if luck <= 0:
-        return items
-    
-    rarity_multiplier = {
-        "Common": 1.0,
-        "Uncommon": 1.0 + (luck * 0.25),
-        "Rare": 1.0 + (luck * 0.5),
-        "Epic": 1.0 + (luck * 0.75),
-        "Legendary": 1.0 + luck,
-    }
-    
-    adjusted_items = []
-    
-    for item in items:
-        rarity = item["rarity"]
-        base_weight = item["drop"]["weight"]
-        multiplier = rarity_multiplier.get(rarity, 1.0)
-        
-        adjusted_items.append({
-            **item,
-            "drop": {
-                "weight": max(1, int(base_weight * multiplier))
-            }
-        })
-        
-    return adjusted_items
\ No newline at end of file
+        return weights.copy()
+
+    # weights * (1 + luck * coef), built in one scratch buffer
+    scaled = coef * luck
+    scaled += 1.0
+    scaled *= weights
+    adjusted = scaled.astype(np.int64)
+    np.maximum(adjusted, 1, out=adjusted)
+    return adjusted
+
+
+# (id(pool), luck) -> (pool, weights, cum, total, lookup, cum_list) for
+# luck levels clients repeat. Smaller than the other caches: a lookup
+# table costs 4 bytes per unit of (boosted) total weight.
+_LUCK_POOL_CACHE_SIZE = 32
+_luck_pools: "OrderedDict[tuple, tuple]" = OrderedDict()
+_luck_pools_lock = Lock()
+
+
+def _luck_pool(items, luck: float):
+    key = (id(items), luck)
+    with _luck_pools_lock:
+        hit = _luck_pools.get(key)
+        if hit is not None and hit[0] is items:
+            _luck_pools.move_to_end(key)
+            return hit
+
+    weights = luck_weights(items, luck)
+    cum, total = _cumulative(items, weights)
+    for array in (weights, cum):
+        array.flags.writeable = False
+    entry = (items, weights, cum, total, _lookup(cum, total), cum.tolist())
+
+    with _luck_pools_lock:
+        # the pool ref keeps id(items) from being reused while cached
+        _luck_pools[key] = entry
+        if len(_luck_pools) > _LUCK_POOL_CACHE_SIZE:
+            _luck_pools.popitem(last=False)
+    return entry
+
+
+def roll_with_luck(items, rng, luck: float):
+    """
+    One roll on luck_weights(items, luck); only the dropped item is rebuilt,
+    with its luck-adjusted weight as drop.weight.
+    """
+    if luck <= 0:
+        return roll_from_items(items, rng)
+
+    _, weights, _, total, lookup, cum_list = _luck_pool(items, luck)
+    if total <= 0:
+        raise ValueError("Loot pool is empty")
+    r = int(rng.random() * total)
+    pos = int(lookup[r]) if lookup is not None else bisect.bisect(cum_list, r)
+    return {**items[pos], "drop": {"weight": int(weights[pos])}}
@@ -1,5 +1,4 @@
-from copy import deepcopy
-from app.import_rules import AUTO_CORRECT_PROFILES, RARITY_KEYS
+from app.import_rules import AUTO_CORRECT_PROFILES, EMPTY_TAGS, RARITY_SET
 
 def auto_correct_loot_table(
     loot_table: dict,
@@ -10,39 +9,69 @@ def auto_correct_loot_table(
     if not config:
         raise ValueError(f"Unknown auto-correct profile: {profile}")
 
-    table = deepcopy(loot_table)
+    table = dict(loot_table)
     changes = []
 
-    # Walk structure
-    for category in table.values():
-        for item_type in category.values():
+    # Copy-on-write: containers are only copied on the path to an item that
+    # actually changes; untouched categories/types/lists are shared with the input
+    for category_name, category in loot_table.items():
+        new_category = None
+        for type_name, item_type in category.items():
+            new_type = None
             for rarity, items in item_type.items():
-                for item in items:
-
-                    # Weight fix
-                    if config["fix_weight"]:
-                        w = item["drop"].get("weight")
-                        if isinstance(w, (int, float)) and w < 1:
-                            item["drop"]["weight"] = 1
-                            changes.append("Clamped drop.weight to minimum 1")
-
-                    # Normalize rarity casing
-                    if config["normalize_rarity"]:
-                        if item["rarity"].capitalize() in RARITY_KEYS:
-                            item["rarity"] = item["rarity"].capitalize()
-
-                    # Clean tags
-                    if config["clean_tags"]:
-                        tags = item.get("tags", [])
-                        if isinstance(tags, list):
-                            clean = [t for t in tags if isinstance(t, str)]
-                            if clean != tags:
-                                item["tags"] = clean
-                                changes.append("Removed invalid tag values")
-
-                    # Fill optional fields
-                    if config["fill_optional_fields"]:
-                        item.setdefault("tags", [])
-                        item.setdefault("stats", {})
+                new_items = None
+                for idx, source in enumerate(items):
+                    item = _corrected_item(source, config, changes)
+                    if item is source:
+                        continue
+
+                    if new_items is None:
+                        if new_type is None:
+                            if new_category is None:
+                                new_category = table[category_name] = dict(category)
+                            new_type = new_category[type_name] = dict(item_type)
+                        new_items = new_type[rarity] = list(items)
+                    new_items[idx] = item
 
     return table, changes
+
+
+def _corrected_item(source: dict, config: dict, changes: list[str]) -> dict:
+    """
+    Returns `source` itself when no rule applies, else a corrected copy
+    (the source item and its drop dict are never mutated).
+    """
+    updates = {}
+
+    # Weight fix
+    if config["fix_weight"]:
+        w = source["drop"].get("weight")
+        if isinstance(w, (int, float)) and w < 1:
+            updates["drop"] = {**source["drop"], "weight": 1}
+            changes.append("Clamped drop.weight to minimum 1")
+
+    # Normalize rarity casing
+    if config["normalize_rarity"]:
+        rarity = source["rarity"].capitalize()
+        if rarity in RARITY_SET and rarity != source["rarity"]:
+            updates["rarity"] = rarity
+
+    # Clean tags
+    if config["clean_tags"]:
+        tags = source.get("tags", EMPTY_TAGS)
+        if isinstance(tags, list):
+            clean = [t for t in tags if isinstance(t, str)]
+            if clean != tags:
+                updates["tags"] = clean
+                changes.append("Removed invalid tag values")
+
+    # Fill optional fields
+    if config["fill_optional_fields"]:
+        if "tags" not in source and "tags" not in updates:
+            updates["tags"] = []
+        if "stats" not in source:
+            updates["stats"] = {}
+
+    if not updates:
+        return source
+    return {**source, **updates}
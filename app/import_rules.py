@@ -1,4 +1,10 @@
+from types import MappingProxyType
+
+# Ordered list: drives summary ordering + the "Allowed: [...]" message text
 RARITY_KEYS = ["Common", "Uncommon", "Rare", "Epic", "Legendary"]
+# O(1) membership / ordered index lookups
+RARITY_SET = frozenset(RARITY_KEYS)
+RARITY_INDEX = {r: i for i, r in enumerate(RARITY_KEYS)}
 
 # Fatal erros = table not safe to run core features
 FATAL_MISSING_ITEM_FIELDS = ["name", "rarity", "type", "drop"]
@@ -7,6 +13,10 @@ FATAL_DROP_FIELDS = ["weight"]
 # Soft warnings = safe, but imperfect / not best practice
 OPTIONAL_FIELDS = ["tags", "stats", "passive"]
 
+# Shared read-only defaults for missing tags/stats (no per-item allocation)
+EMPTY_TAGS = ()
+EMPTY_STATS = MappingProxyType({})
+
 AUTO_CORRECT_PROFILES = {
     "safe": {
         "fix_weight": True,
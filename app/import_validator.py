@@ -1,8 +1,16 @@
-from typing import Any, Dict, List, Tuple
-from app.import_rules import RARITY_KEYS, FATAL_MISSING_ITEM_FIELDS, FATAL_DROP_FIELDS
+from typing import Any, Dict, List
+from app.import_rules import RARITY_KEYS, RARITY_SET, FATAL_MISSING_ITEM_FIELDS, FATAL_DROP_FIELDS
+
+# Required-key sets: one C-level subset test per item on the happy path
+_REQ_ITEM = frozenset(FATAL_MISSING_ITEM_FIELDS)
+_REQ_DROP = frozenset(FATAL_DROP_FIELDS)
 
 
 def validate_loot_table(loot_table: Any) -> Dict[str, Any]:
+    """
+    Issue paths are built only for items that have an issue, from a
+    container prefix formatted once per rarity list.
+    """
     errors: List[Dict[str, str]] = []
     warnings: List[Dict[str, str]] = []
 
@@ -63,39 +71,40 @@ def validate_loot_table(loot_table: Any) -> Dict[str, Any]:
 
             # Walk rarities
             for rarity_key, items in type_obj.items():
+                container = f"$.{cat_name}.{type_name}.{rarity_key}"
+
                 if not isinstance(items, list):
                     errors.append({
-                        "path": f"$.{cat_name}.{type_name}.{rarity_key}",
+                        "path": container,
                         "message": "Rarity entry must be a list of item objects."
                     })
                     continue
 
-                # Track unknown rarity keys (non-fatal)
-                if rarity_key not in RARITY_KEYS:
+                # Track unknown rarity keys (non-fatal); resolved once per container
+                known_rarity = rarity_key in RARITY_SET
+                if not known_rarity:
                     summary["unknown_rarity_counts"][rarity_key] = (
                         summary["unknown_rarity_counts"].get(rarity_key, 0) + len(items)
                     )
                     warnings.append({
-                        "path": f"$.{cat_name}.{type_name}.{rarity_key}",
+                        "path": container,
                         "message": f"Unknown rarity key '{rarity_key}'. Allowed: {RARITY_KEYS}"
                     })
 
                 # Walk items
                 for i, item in enumerate(items):
-                    path = f"$.{cat_name}.{type_name}.{rarity_key}[{i}]"
-
                     if not isinstance(item, dict):
                         errors.append({
-                            "path": path,
+                            "path": f"{container}[{i}]",
                             "message": "Item must be an object/dict."
                         })
                         continue
 
-                    # Required fields
-                    missing = [f for f in FATAL_MISSING_ITEM_FIELDS if f not in item]
-                    if missing:
+                    # Required fields (message keeps FATAL_MISSING_ITEM_FIELDS order)
+                    if not _REQ_ITEM <= item.keys():
+                        missing = [f for f in FATAL_MISSING_ITEM_FIELDS if f not in item]
                         errors.append({
-                            "path": path,
+                            "path": f"{container}[{i}]",
                             "message": f"Missing required fields: {', '.join(missing)}"
                         })
                         continue
@@ -103,7 +112,7 @@ def validate_loot_table(loot_table: Any) -> Dict[str, Any]:
                     # name
                     if not isinstance(item["name"], str) or not item["name"].strip():
                         errors.append({
-                            "path": f"{path}.name",
+                            "path": f"{container}[{i}].name",
                             "message": "Item name must be a non-empty string."
                         })
                         continue
@@ -111,14 +120,14 @@ def validate_loot_table(loot_table: Any) -> Dict[str, Any]:
                     # rarity value must match container key
                     if not isinstance(item["rarity"], str):
                         errors.append({
-                            "path": f"{path}.rarity",
+                            "path": f"{container}[{i}].rarity",
                             "message": "Item rarity must be a string."
                         })
                         continue
 
                     if item["rarity"] != rarity_key:
                         errors.append({
-                            "path": f"{path}.rarity",
+                            "path": f"{container}[{i}].rarity",
                             "message": f"Item rarity '{item['rarity']}' must match container rarity '{rarity_key}'."
                         })
                         continue
@@ -127,15 +136,15 @@ def validate_loot_table(loot_table: Any) -> Dict[str, Any]:
                     drop = item["drop"]
                     if not isinstance(drop, dict):
                         errors.append({
-                            "path": f"{path}.drop",
+                            "path": f"{container}[{i}].drop",
                             "message": "drop must be an object/dict."
                         })
                         continue
 
-                    missing_drop = [f for f in FATAL_DROP_FIELDS if f not in drop]
-                    if missing_drop:
+                    if not _REQ_DROP <= drop.keys():
+                        missing_drop = [f for f in FATAL_DROP_FIELDS if f not in drop]
                         errors.append({
-                            "path": f"{path}.drop",
+                            "path": f"{container}[{i}].drop",
                             "message": f"Missing required drop fields: {', '.join(missing_drop)}"
                         })
                         continue
@@ -143,13 +152,13 @@ def validate_loot_table(loot_table: Any) -> Dict[str, Any]:
                     weight = drop.get("weight")
                     if not isinstance(weight, int):
                         errors.append({
-                            "path": f"{path}.drop.weight",
+                            "path": f"{container}[{i}].drop.weight",
                             "message": "drop.weight must be an integer >= 1."
                         })
                         continue
                     if weight < 1:
                         errors.append({
-                            "path": f"{path}.drop.weight",
+                            "path": f"{container}[{i}].drop.weight",
                             "message": "drop.weight must be >= 1."
                         })
                         continue
@@ -157,25 +166,25 @@ def validate_loot_table(loot_table: Any) -> Dict[str, Any]:
                     # Optional fields warnings (non-fatal)
                     if "tags" not in item:
                         warnings.append({
-                            "path": path,
+                            "path": f"{container}[{i}]",
                             "message": "Missing optional field 'tags' (recommended)."
                         })
                     else:
                         if not isinstance(item["tags"], list) or any(not isinstance(t, str) for t in item["tags"]):
                             warnings.append({
-                                "path": f"{path}.tags",
+                                "path": f"{container}[{i}].tags",
                                 "message": "tags should be a list[str]."
                             })
 
                     if "stats" in item and not isinstance(item["stats"], dict):
                         warnings.append({
-                            "path": f"{path}.stats",
+                            "path": f"{container}[{i}].stats",
                             "message": "stats should be an object/dict of numeric values."
                         })
 
                     # Update counts
                     summary["total_items"] += 1
-                    if rarity_key in RARITY_KEYS:
+                    if known_rarity:
                         summary["rarity_counts"][rarity_key] += 1
 
     # Determine validity
@@ -0,0 +1,296 @@
+# app/indexes.py
+"""
+Read-only lookup structures over the built-in loot table, built once at import.
+Endpoints return/serialize these directly instead of re-walking the table;
+callers must treat every list and dict here as immutable.
+"""
+
+from collections import OrderedDict
+from functools import lru_cache
+from threading import Lock
+from typing import Any, Dict, Iterable, List, Tuple
+
+import numpy as np
+
+from app.import_rules import RARITY_KEYS
+from app.loot_loader import get_loot_table
+
+Item = Dict[str, Any]
+
+
+def _build_indexes(loot_table: Dict[str, Any]) -> Tuple[
+    List[Item],
+    Dict[str, List[Item]],
+    Dict[str, List[Item]],
+    Dict[str, List[Item]],
+    List[str],
+]:
+    """
+    One pass over category -> type -> rarity -> items.
+    Returns (all_items, by_category, by_rarity, by_tag, sorted_stats).
+    Rarity keys are the container keys as stored in the table.
+    """
+    all_items: List[Item] = []
+    by_category: Dict[str, List[Item]] = {}
+    by_rarity: Dict[str, List[Item]] = {}
+    by_tag: Dict[str, List[Item]] = {}
+    stats: set = set()
+
+    for category_name, category in loot_table.items():
+        category_items = by_category.setdefault(category_name, [])
+        for item_type in category.values():
+            for rarity, rarity_items in item_type.items():
+                all_items.extend(rarity_items)
+                category_items.extend(rarity_items)
+                by_rarity.setdefault(rarity, []).extend(rarity_items)
+
+                for item in rarity_items:
+                    # an item listing a tag twice is indexed once
+                    for tag in dict.fromkeys(item.get("tags", ())):
+                        by_tag.setdefault(tag, []).append(item)
+                    stats.update(item.get("stats", {}).keys())
+
+    return all_items, by_category, by_rarity, by_tag, sorted(stats)
+
+
+def _fold_rarity_case(by_rarity: Dict[str, List[Item]]) -> Dict[str, List[Item]]:
+    """
+    by_rarity re-keyed on rarity.lower(). Keys that are already lowercase
+    (the bundled table) share their list with by_rarity.
+    """
+    folded: Dict[str, List[Item]] = {}
+    for rarity, items in by_rarity.items():
+        key = rarity.lower()
+        folded[key] = folded[key] + items if key in folded else items
+    return folded
+
+
+LOOT_TABLE = get_loot_table()
+
+(
+    ALL_ITEMS,
+    ITEMS_BY_CATEGORY,
+    ITEMS_BY_RARITY,
+    ITEMS_BY_TAG,
+    ALL_STATS_SORTED,
+) = _build_indexes(LOOT_TABLE)
+
+ALL_TAGS_SORTED: List[str] = sorted(ITEMS_BY_TAG)
+CATEGORIES: List[str] = list(LOOT_TABLE.keys())
+ITEMS_BY_RARITY_LOWER: Dict[str, List[Item]] = _fold_rarity_case(ITEMS_BY_RARITY)
+LEGENDARY_ITEMS: List[Item] = ITEMS_BY_RARITY_LOWER.get("legendary", [])
+
+# item["rarity"] -> small int code: canonical tiers first (code == tier
+# index), then any other spelling the table uses, in table order
+RARITY_NAMES: List[str] = list(dict.fromkeys(
+    [*RARITY_KEYS, *(item["rarity"] for item in ALL_ITEMS)]
+))
+RARITY_CODE: Dict[str, int] = {name: code for code, name in enumerate(RARITY_NAMES)}
+
+
+def _build_columns(items: List[Item]) -> Tuple[
+    List[str], np.ndarray, np.ndarray, np.ndarray, Dict[str, int], np.ndarray, np.ndarray
+]:
+    """
+    Struct-of-arrays view of `items`, one row per item:
+    (name_list, name_codes, weights, rarity_codes, tag_code, tag_indptr, tag_indices).
+    Tags are CSR: item i's tag codes are tag_indices[tag_indptr[i]:tag_indptr[i + 1]].
+    """
+    name_code: Dict[str, int] = {}
+    names, weights, rarities, tag_counts, tag_ids = [], [], [], [], []
+    tag_code = {tag: code for code, tag in enumerate(ALL_TAGS_SORTED)}
+
+    for item in items:
+        names.append(name_code.setdefault(item["name"], len(name_code)))
+        weights.append(item["drop"]["weight"])
+        rarities.append(RARITY_CODE[item["rarity"]])
+        tags = item.get("tags", ())
+        tag_counts.append(len(tags))
+        tag_ids.extend(tag_code[tag] for tag in tags)
+
+    tag_indptr = np.zeros(len(items) + 1, dtype=np.int32)
+    np.cumsum(tag_counts, out=tag_indptr[1:])
+
+    return (
+        list(name_code),
+        np.array(names, dtype=np.int32),
+        np.array(weights, dtype=np.int64),
+        np.array(rarities, dtype=np.int8),
+        tag_code,
+        tag_indptr,
+        np.array(tag_ids, dtype=np.int32),
+    )
+
+
+(
+    NAME_LIST,
+    ITEM_NAME_CODES,
+    ITEM_WEIGHTS,
+    ITEM_RARITY,
+    TAG_CODE,
+    TAG_INDPTR,
+    TAG_INDICES,
+) = _build_columns(ALL_ITEMS)
+
+
+def _build_placement(loot_table: Dict[str, Any]) -> Tuple[
+    List[str], np.ndarray, List[str], np.ndarray
+]:
+    """
+    Where each item sits in the table, one row per item in table order
+    (== ALL_ITEMS): (category_names, category_codes, type_names, type_codes).
+    Type names are shared across categories, as the table's type keys are.
+    """
+    category_code: Dict[str, int] = {}
+    type_code: Dict[str, int] = {}
+    categories, types = [], []
+
+    for category_name, category in loot_table.items():
+        category_id = category_code.setdefault(category_name, len(category_code))
+        for type_name, item_type in category.items():
+            type_id = type_code.setdefault(type_name, len(type_code))
+            for rarity_items in item_type.values():
+                categories.extend([category_id] * len(rarity_items))
+                types.extend([type_id] * len(rarity_items))
+
+    return (
+        list(category_code),
+        np.array(categories, dtype=np.int16),
+        list(type_code),
+        np.array(types, dtype=np.int16),
+    )
+
+
+def _build_stat_matrix(items: List[Item]) -> np.ndarray:
+    """
+    float64 [len(items), len(ALL_STATS_SORTED)]: item i's value for stat j,
+    NaN where the item lacks the stat or its value is not a number (bools
+    are flags, not numbers).
+    """
+    stat_col = {stat: col for col, stat in enumerate(ALL_STATS_SORTED)}
+    matrix = np.full((len(items), len(stat_col)), np.nan)
+    for row, item in enumerate(items):
+        for stat, value in item.get("stats", {}).items():
+            if type(value) is not bool and isinstance(value, (int, float)):
+                matrix[row, stat_col[stat]] = value
+    return matrix
+
+
+(
+    CATEGORY_NAMES,
+    ITEM_CATEGORY,
+    TYPE_NAMES,
+    ITEM_TYPE,
+) = _build_placement(LOOT_TABLE)
+
+# numeric stats only; NaN marks missing (use np.nanmean & co. per column)
+STAT_MATRIX = _build_stat_matrix(ALL_ITEMS)
+
+for _column in (
+    ITEM_NAME_CODES,
+    ITEM_WEIGHTS,
+    ITEM_RARITY,
+    TAG_INDPTR,
+    TAG_INDICES,
+    ITEM_CATEGORY,
+    ITEM_TYPE,
+    STAT_MATRIX,
+):
+    _column.flags.writeable = False
+
+# id(item) -> row in the columns above (== position in ALL_ITEMS)
+_ITEM_ROW: Dict[int, int] = {id(item): row for row, item in enumerate(ALL_ITEMS)}
+
+# Rows for pools: static index lists up front, ad-hoc pools (tag filters)
+# through a small LRU. Both key on list identity and pin the list.
+_STATIC_ROWS: Dict[int, Tuple[List[Item], np.ndarray]] = {}
+_ROWS_CACHE_SIZE = 256
+_rows_cache: "OrderedDict[int, Tuple[List[Item], np.ndarray]]" = OrderedDict()
+_rows_cache_lock = Lock()
+
+
+def _rows_of(items: List[Item]) -> np.ndarray:
+    rows = np.fromiter(
+        (_ITEM_ROW[id(item)] for item in items),
+        dtype=np.intp,
+        count=len(items),
+    )
+    rows.flags.writeable = False
+    return rows
+
+
+def pool_rows(items: List[Item]) -> np.ndarray:
+    """
+    Column rows for a pool of LOOT_TABLE items, parallel to `items`:
+    ITEM_RARITY[pool_rows(items)] is the rarity code of each pool item.
+    """
+    key = id(items)
+    hit = _STATIC_ROWS.get(key)
+    if hit is not None and hit[0] is items:
+        return hit[1]
+
+    with _rows_cache_lock:
+        hit = _rows_cache.get(key)
+        if hit is not None and hit[0] is items:
+            _rows_cache.move_to_end(key)
+            return hit[1]
+
+    rows = _rows_of(items)
+    with _rows_cache_lock:
+        _rows_cache[key] = (items, rows)
+        if len(_rows_cache) > _ROWS_CACHE_SIZE:
+            _rows_cache.popitem(last=False)
+    return rows
+
+
+for _pool in (
+    ALL_ITEMS,
+    LEGENDARY_ITEMS,
+    *ITEMS_BY_CATEGORY.values(),
+    *ITEMS_BY_RARITY_LOWER.values(),
+    *ITEMS_BY_TAG.values(),
+):
+    _STATIC_ROWS[id(_pool)] = (_pool, _rows_of(_pool))
+
+
+def rarity_codes(items: List[Item]) -> np.ndarray:
+    """
+    int8 rarity code per item, parallel to `items` (items from LOOT_TABLE).
+    """
+    return ITEM_RARITY[pool_rows(items)]
+
+
+def _build_tag_bits() -> np.ndarray:
+    """
+    Packed membership bitsets, one row per tag code: bit i of row t is set
+    when ALL_ITEMS[i] carries tag t. Multi-tag filters AND whole rows.
+    """
+    member = np.zeros((len(TAG_CODE), len(ALL_ITEMS)), dtype=bool)
+    rows = np.repeat(np.arange(len(ALL_ITEMS)), np.diff(TAG_INDPTR))
+    member[TAG_INDICES, rows] = True
+    bits = np.packbits(member, axis=1)
+    bits.flags.writeable = False
+    return bits
+
+
+TAG_BITS = _build_tag_bits()
+
+
+@lru_cache(maxsize=256)
+def _items_for_tag_key(tags_key: Tuple[str, ...]) -> List[Item]:
+    if not tags_key:
+        return ALL_ITEMS
+    codes = [TAG_CODE.get(tag) for tag in tags_key]
+    if None in codes:
+        return []
+    bits = np.bitwise_and.reduce(TAG_BITS[codes], axis=0)
+    rows = np.flatnonzero(np.unpackbits(bits, count=len(ALL_ITEMS)))
+    return [ALL_ITEMS[row] for row in rows.tolist()]
+
+
+def items_for_tags(tags: Iterable[str]) -> List[Item]:
+    """
+    Items carrying ALL of `tags`, in table order (every item for no tags).
+    Memoized on the distinct tag set, so repeated filters share one list.
+    """
+    return _items_for_tag_key(tuple(sorted(set(tags))))
@@ -1,7 +1,71 @@
-import json
+import functools
+import sys
 from pathlib import Path
+from typing import Any, Dict
+
+import orjson
 
 LOOT_TABLE_PATH = Path(__file__).parent / "loot_table.json"
 
-with open(LOOT_TABLE_PATH, "r") as f:
-    LOOT_TABLE = json.load(f)
\ No newline at end of file
+
+@functools.cache
+def get_loot_table() -> Dict[str, Any]:
+    """
+    Parsed built-in loot table, loaded on first use (orjson) and shared afterwards
+    within the process. Every worker process parses its own copy unless the
+    app is imported before a fork (see run.py).
+    Read-only for the process lifetime: indexes, pool caches and pre-encoded
+    responses are built from it once and never invalidated.
+    """
+    return _intern(orjson.loads(LOOT_TABLE_PATH.read_bytes()))
+
+
+def _intern(obj: Any) -> Any:
+    """
+    Interns every key/string value so repeated rarities, tags and stat names
+    collapse to one object (identity fast-path on dict lookups and ==).
+    """
+    if isinstance(obj, dict):
+        return {
+            (sys.intern(k) if isinstance(k, str) else k): _intern(v)
+            for k, v in obj.items()
+        }
+    if isinstance(obj, list):
+        return [_intern(v) for v in obj]
+    if isinstance(obj, str):
+        return sys.intern(obj)
+    return obj
+
+
+def __getattr__(name: str) -> Any:
+    # Back-compat: `from app.loot_loader import LOOT_TABLE` still works, lazily
+    if name == "LOOT_TABLE":
+        return get_loot_table()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def reweightable_copy(loot_table: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Copy of a loot table whose item dicts and their "drop" dicts are new, so
+    weights can be rewritten in place; everything else (tags, stats, ...)
+    stays shared with the source and must not be mutated.
+    """
+    def item_copy(item: Any) -> Any:
+        if not isinstance(item, dict):
+            return item
+        item = dict(item)
+        drop = item.get("drop")
+        if isinstance(drop, dict):
+            item["drop"] = dict(drop)
+        return item
+
+    return {
+        category: {
+            item_type: {
+                rarity: [item_copy(item) for item in items]
+                for rarity, items in rarities.items()
+            }
+            for item_type, rarities in types.items()
+        }
+        for category, types in loot_table.items()
+    }
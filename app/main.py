@@ -1,7 +1,14 @@
-from fastapi import FastAPI, HTTPException
-from typing import List, Dict, Any
-import copy
-from copy import deepcopy
+import hashlib
+import os
+from contextlib import asynccontextmanager
+from functools import cache, lru_cache, partial, wraps
+from typing import List, Any
+
+import anyio
+import anyio.to_thread
+import numpy as np
+import orjson
+from fastapi import FastAPI, HTTPException, Request, Response
 from fastapi.responses import JSONResponse
 
 from app.autocorrect_engine import (
@@ -9,19 +16,43 @@ from app.autocorrect_engine import (
     build_autocorrect_diff, 
     get_profile_capabilities, 
     apply_autocorrect,
+    serialize_preview,
+    RARITY_ORDER,
 )
 
+from app.analysis import analyze_drops, rarity_percentages, tag_tally
 from app.import_validator import validate_loot_table
-from app.loot_loader import LOOT_TABLE
+from app.indexes import (
+    ALL_ITEMS,
+    ALL_STATS_SORTED,
+    ALL_TAGS_SORTED,
+    CATEGORIES,
+    CATEGORY_NAMES,
+    ITEM_CATEGORY,
+    ITEM_RARITY,
+    ITEM_TYPE,
+    ITEMS_BY_CATEGORY,
+    ITEMS_BY_RARITY_LOWER,
+    ITEMS_BY_TAG,
+    LEGENDARY_ITEMS,
+    RARITY_NAMES,
+    STAT_MATRIX,
+    TAG_CODE,
+    TAG_INDICES,
+    TYPE_NAMES,
+    items_for_tags,
+    rarity_codes,
+)
+from app.loot_loader import get_loot_table, reweightable_copy
 from app.rng import get_rng
 
 from app.drop_engine import (
-    extract_all_items,
-    extract_items_by_tag,
-    extract_items_by_tags,
+    precompute_pools,
     roll_from_items,
-    simulate_drops,
-    apply_luck,
+    simulate_drop_indices,
+    summarize_draws,
+    tally_codes,
+    roll_with_luck,
 )
 
 from app.schemas import (
@@ -33,6 +64,7 @@ from app.schemas import (
     SimulationRequest,
     LuckDropRequest,
     LuckSimulateRequest,
+    SimulationBatchRequest,
     CompareSimulationRequest,
     BalanceRequest,
     ReweightRequest,
@@ -42,24 +74,116 @@ from app.schemas import (
 )
 
 
+# Load the built-in table eagerly, once per process, so the first request
+# does not pay for parsing and indexing it. run.py's uvicorn workers are
+# spawned, not forked: each one re-imports this module and builds its own.
+LOOT_TABLE = get_loot_table()
+
+
+class ORJSONResponse(JSONResponse):
+    """
+    JSON response rendered with orjson. Defined here rather than imported
+    from fastapi.responses, whose copy is deprecated in current releases.
+    Handlers returning whole tables build one directly: FastAPI passes a
+    returned Response through as is, skipping its per-value encoder walk.
+    """
+
+    def render(self, content: Any) -> bytes:
+        return orjson.dumps(
+            content, option=orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+        )
+
+
+# Every static pool an endpoint can roll on gets its cumulative weights now
+precompute_pools([
+    ALL_ITEMS,
+    LEGENDARY_ITEMS,
+    *ITEMS_BY_CATEGORY.values(),
+    *ITEMS_BY_RARITY_LOWER.values(),
+    *ITEMS_BY_TAG.values(),
+])
+
+@asynccontextmanager
+async def _lifespan(app):
+    # sync (simulation/balance) handlers share anyio's threadpool, 40 by default
+    threads = os.environ.get("LOOT_API_THREADS")
+    if threads:
+        anyio.to_thread.current_default_thread_limiter().total_tokens = int(threads)
+    yield
+
+
 app = FastAPI(
+    lifespan=_lifespan,
+    default_response_class=ORJSONResponse,
     title="Loot Table API",
     description="AAA-grade loot RNG system for game developers — compatible with Unity, Roblox, Unreal, Godot.",
     version="3.0.0",
 )
 
+# Handlers that only read startup indexes or roll once are `async def`:
+# they run on the event loop with no threadpool hop. Simulation and balance
+# handlers are plain `def` wrapped in @_cpu_bound: their work runs on the
+# threadpool, at most LOOT_API_CPU_SLOTS (default: CPU count; run.py sets 2
+# per worker) at a time, so a burst of simulations cannot take every pool
+# thread from other routes.
+_CPU_LIMITER = anyio.CapacityLimiter(
+    int(os.environ.get("LOOT_API_CPU_SLOTS") or os.cpu_count() or 1)
+)
+
+
+def _cpu_bound(func):
+    @wraps(func)
+    async def handler(*args, **kwargs):
+        return await anyio.to_thread.run_sync(
+            partial(func, *args, **kwargs), limiter=_CPU_LIMITER
+        )
+    return handler
+
 # ============================================================
 # HEALTH CHECK
 # ============================================================
 
 @app.get("/health", tags=["Health"], response_model=dict)
-def health_check():
+async def health_check():
     return {"status": "ok"}
 
 
 # ============================================================
 # METADATA ENDPOINTS
 # ============================================================
+# These payloads never change while the process runs, so they are encoded
+# once here and served as raw bytes with a strong ETag.
+_STATIC_CACHE_CONTROL = "public, max-age=3600"
+
+
+def _static_json(payload: Any) -> tuple[bytes, str]:
+    body = orjson.dumps(payload)
+    return body, '"' + hashlib.blake2b(body, digest_size=8).hexdigest() + '"'
+
+
+def _static_response(request: Request, body: bytes, etag: str) -> Response:
+    headers = {"ETag": etag, "Cache-Control": _STATIC_CACHE_CONTROL}
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match:
+        candidates = {tag.strip() for tag in if_none_match.split(",")}
+        if etag in candidates or "*" in candidates:
+            return Response(status_code=304, headers=headers)
+    return Response(content=body, media_type="application/json", headers=headers)
+
+
+SCHEMA_JSON, SCHEMA_ETAG = _static_json(LOOT_TABLE)
+TAGS_JSON, TAGS_ETAG = _static_json(ALL_TAGS_SORTED)
+STATS_JSON, STATS_ETAG = _static_json(ALL_STATS_SORTED)
+CATEGORIES_JSON, CATEGORIES_ETAG = _static_json(CATEGORIES)
+INFO_JSON, INFO_ETAG = _static_json({
+    "name": "Loot Table API",
+    "version": "3.0.0",
+    "item_count": len(ALL_ITEMS),
+    "categories": list(CATEGORIES),
+    "author": "Sam Grabar",
+    "license": "Commercial",
+})
+
 @app.get(
     "/info", 
     tags=["Metadata"], 
@@ -67,15 +191,8 @@ def health_check():
     description="Returns API build version, author, items counts, and structure overview", 
     response_model=dict
 )
-def info():
-    return {
-        "name": "Loot Table API",
-        "version": "3.0.0",
-        "item_count": len(extract_all_items(LOOT_TABLE)),
-        "categories": list(LOOT_TABLE.keys()),
-        "author": "Sam Grabar",
-        "license": "Commercial",
-    }
+async def info(request: Request):
+    return _static_response(request, INFO_JSON, INFO_ETAG)
 
 @app.get(
     "/schema",
@@ -84,8 +201,8 @@ def info():
     description="Useful for debugging, browsing items, or exporting your starting schema.", 
     response_model=dict
 )
-def schema():
-    return LOOT_TABLE
+async def schema(request: Request):
+    return _static_response(request, SCHEMA_JSON, SCHEMA_ETAG)
 
 
 @app.get(
@@ -95,14 +212,8 @@ def schema():
     description="Used for filtering simulations, dropsm abd crafting analysis.", 
     response_model=List[str]
 )
-def list_tags():
-    tags = set()
-    for category in LOOT_TABLE.values():
-        for item_type in category.values():
-            for rarity_items in item_type.values():
-                for item in rarity_items:
-                    tags.update(item.get("tags", []))
-    return sorted(tags)
+async def list_tags(request: Request):
+    return _static_response(request, TAGS_JSON, TAGS_ETAG)
 
 
 @app.get(
@@ -112,14 +223,8 @@ def list_tags():
     description="Strength / Agility / Luck / AttackSpeed / etc.", 
     response_model=List[str]
 )
-def list_stats():
-    stats = set()
-    for category in LOOT_TABLE.values():
-        for item_type in category.values():
-            for rarity_items in item_type.values():
-                for item in rarity_items:
-                    stats.update(item.get("stats", {}).keys())
-    return sorted(stats)
+async def list_stats(request: Request):
+    return _static_response(request, STATS_JSON, STATS_ETAG)
 
 
 @app.get(
@@ -129,8 +234,8 @@ def list_stats():
     description="All searchable categories used in the loot table.", 
     response_model=List[str]
 )
-def list_categories():
-    return list(LOOT_TABLE.keys())
+async def list_categories(request: Request):
+    return _static_response(request, CATEGORIES_JSON, CATEGORIES_ETAG)
 
 
 #============================================================
@@ -138,7 +243,7 @@ def list_categories():
 #============================================================
 
 @app.get("/rarity/schema", tags=["Help"])
-def rarity_schema():
+async def rarity_schema():
     return {
         "Common": "float % value",
         "Uncommon": "float % value",
@@ -151,6 +256,17 @@ def rarity_schema():
 # ITEM SEARCH
 # ============================================================
 
+@lru_cache(maxsize=1024)
+def _items_by_tag_json(tag: str) -> bytes:
+    # tag lists are fixed at startup; bounded since unknown tags cache too
+    items = ITEMS_BY_TAG.get(tag, [])
+    return orjson.dumps({
+        "tag": tag,
+        "count": len(items),
+        "items": items,
+    })
+
+
 @app.post(
     "/items/by-tag/{tag}",
     tags=["Item Search"],
@@ -158,13 +274,8 @@ def rarity_schema():
     description="Example tags: fire | frost | sword | healing | ring | rare",
     response_model=dict
 )
-def items_by_tag(tag: str):
-    items = extract_items_by_tag(LOOT_TABLE, tag)
-    return {
-        "tag": tag,
-        "count": len(items),
-        "items": items,
-    }
+async def items_by_tag(tag: str):
+    return Response(content=_items_by_tag_json(tag), media_type="application/json")
 
 
 @app.post(
@@ -174,19 +285,31 @@ def items_by_tag(tag: str):
     description="Returns only items that contain ALL requested tags.",
     response_model=dict
 )
-def items_by_tags(req: TagSearchRequest):
-    items = extract_items_by_tags(LOOT_TABLE, req.tags)
-    return {
+async def items_by_tags(req: TagSearchRequest):
+    items = items_for_tags(req.tags)
+    return ORJSONResponse({
         "tags": req.tags,
         "count": len(items),
         "items": items,
-    }
+    })
 
 
 # ============================================================
 # SINGLE DROPS
 # ============================================================
 
+def _tag_pool(tags):
+    """
+    Pool for endpoints with an optional tag filter: everything when no tags.
+    """
+    if not tags:
+        return ALL_ITEMS
+    items = items_for_tags(tags)
+    if not items:
+        raise HTTPException(400, "No items match provided tags")
+    return items
+
+
 @app.post(
     "/drop",
     tags=["Drops"],
@@ -194,10 +317,9 @@ def items_by_tags(req: TagSearchRequest):
     description="Ignores rarity and category. Uses weighted probability table.", 
     response_model=dict
 )
-def drop_any(req: DropRequest):
+async def drop_any(req: DropRequest):
     rng = get_rng(req.seed)
-    items = extract_all_items(LOOT_TABLE)
-    return {"drop": roll_from_items(items, rng)}
+    return {"drop": roll_from_items(ALL_ITEMS, rng)}
 
 
 @app.post(
@@ -207,18 +329,14 @@ def drop_any(req: DropRequest):
     description="Armor-only drops, Weapon-only drops, Jewellery, Materials, etc.", 
     response_model=dict
 )
-def drop_by_category(req: CategoryDropRequest):
+async def drop_by_category(req: CategoryDropRequest):
     category = req.category.lower()
 
-    if category not in LOOT_TABLE:
+    if category not in ITEMS_BY_CATEGORY:
         raise HTTPException(400, "Invalid category name")
 
     rng = get_rng(req.seed)
-    items = []
-
-    for item_type in LOOT_TABLE[category].values():
-        for rarity in item_type.values():
-            items.extend(rarity)
+    items = ITEMS_BY_CATEGORY[category]
 
     return {"category": category, "drop": roll_from_items(items, rng)}
 
@@ -230,14 +348,11 @@ def drop_by_category(req: CategoryDropRequest):
     description="Common / Uncommon / Rare / Epic / Legendary restricted RNG.",
     response_model=dict
 )
-def drop_by_rarity(req: RarityDropRequest):
+async def drop_by_rarity(req: RarityDropRequest):
     rarity = req.rarity.value.lower()
     rng = get_rng(req.seed)
 
-    items = []
-    for category in LOOT_TABLE.values():
-        for item_type in category.values():
-            items.extend(item_type.get(rarity, []))
+    items = ITEMS_BY_RARITY_LOWER.get(rarity)
 
     if not items:
         raise HTTPException(400, "No items for that rarity")
@@ -252,8 +367,8 @@ def drop_by_rarity(req: RarityDropRequest):
     description="Useful for ability or class–specific loot rolls.", 
     response_model=dict
 )
-def drop_by_tag(tag: str, seed: int | None = None):
-    items = extract_items_by_tag(LOOT_TABLE, tag)
+async def drop_by_tag(tag: str, seed: int | None = None):
+    items = ITEMS_BY_TAG.get(tag, [])
 
     if not items:
         raise HTTPException(400, "No items contain this tag")
@@ -269,8 +384,8 @@ def drop_by_tag(tag: str, seed: int | None = None):
     description="Returns loot that matches all tags simultaneously.", 
     response_model=dict
 )
-def drop_by_tags(req: TagDropRequest):
-    items = extract_items_by_tags(LOOT_TABLE, req.tags)
+async def drop_by_tags(req: TagDropRequest):
+    items = items_for_tags(req.tags)
 
     if not items:
         raise HTTPException(400, "No items match these tags")
@@ -286,19 +401,13 @@ def drop_by_tags(req: TagDropRequest):
     description="luck=1.0 dramatically improves rare/legendary probability.",
     response_model=dict
 )
-def drop_with_luck(req: LuckDropRequest):
+async def drop_with_luck(req: LuckDropRequest):
     luck = max(0.0, min(req.luck, 1.0))
     rng = get_rng(req.seed)
 
-    if req.tags:
-        items = extract_items_by_tags(LOOT_TABLE, req.tags)
-        if not items:
-            raise HTTPException(400, "No items match provided tags")
-    else:
-        items = extract_all_items(LOOT_TABLE)
+    items = _tag_pool(req.tags)
 
-    adjusted_items = apply_luck(items, luck)
-    drop = roll_from_items(adjusted_items, rng)
+    drop = roll_with_luck(items, rng, luck)
 
     return {
         "luck": luck,
@@ -311,19 +420,17 @@ def drop_with_luck(req: LuckDropRequest):
 #=============================================================
 
 @app.get(
-    "/legenday-preview",
+    "/legendary-preview",
     tags=["Debug / Preview"],
     summary="Show a single legendary result",
     description="Used as a live RNG validator inside docs.", 
     response_model=dict
 )
-def legendary_preview():
-    items = []
-    for category in LOOT_TABLE.values():
-        for item_type in category.values():
-            items.extend(item_type.get("legendary", []))
+# the original misspelled path, kept for existing clients
+@app.get("/legenday-preview", response_model=dict, include_in_schema=False)
+async def legendary_preview():
     rng = get_rng()
-    return {"legendary": roll_from_items(items, rng)}
+    return {"legendary": roll_from_items(LEGENDARY_ITEMS, rng)}
 
 
 # ============================================================
@@ -337,83 +444,17 @@ def legendary_preview():
     description="Returns rarity distribution statistics and top item results.", 
     response_model=dict
 )
+@_cpu_bound
 def simulate(req: SimulationRequest):
-
-    if req.simulations > 100_000:
-        raise HTTPException(400, "Simulation limit exceeded")
-
     rng = get_rng(req.seed)
 
-    if req.tags:
-        items = extract_items_by_tags(LOOT_TABLE, req.tags)
-        if not items:
-            raise HTTPException(400, "No items match provided tags")
-    else:
-        items = extract_all_items(LOOT_TABLE)
-
-    drops = simulate_drops(items, rng, req.simulations)
-
-    rarity_counts = {}
-    item_counts = {}
-    item_rarity = {}
-    tag_counts = {}
-
-    for item in drops:
-
-        rar = item["rarity"]
-        rarity_counts[rar] = rarity_counts.get(rar, 0) + 1
-
-        name = item["name"]
-        item_counts[name] = item_counts.get(name, 0) + 1
-        item_rarity[name] = rar
-
-        for tag in item.get("tags", []):
-            tag_counts[tag] = tag_counts.get(tag, 0) + 1
-
-    # enforce correct rarity order
-    rarity_order = [
-        "Common",
-        "Uncommon",
-        "Rare",
-        "Epic",
-        "Legendary"
-    ]
-
-    rarity_distribution = {
-        r: round((rarity_counts.get(r, 0) / req.simulations) * 100, 2)
-        for r in rarity_order
-        if r in rarity_counts
-    }
-
-    # rarity selectors
-    def top_by_rarity(target, limit=3):
-        return [
-            (name, count)
-            for name, count in sorted(
-                item_counts.items(),
-                key=lambda x: x[1],
-                reverse=True
-            )
-            if item_rarity.get(name) == target
-        ][:limit]
-
-    warnings = []
+    items = _tag_pool(req.tags)
 
-    if rarity_distribution.get("Legendary", 0) < 0.5:
-        warnings.append("Legendary items drop less than 0.5% of the time.")
+    idx = simulate_drop_indices(items, rng, req.simulations)
 
     return {
         "simulations": req.simulations,
-        "rarity_distribution": rarity_distribution,
-        "top_items_overall": sorted(
-            item_counts.items(),
-            key=lambda x: x[1],
-            reverse=True
-        )[:10],
-        "top_rare_items": top_by_rarity("Rare"),
-        "top_epic_items": top_by_rarity("Epic"),
-        "top_legendary_items": top_by_rarity("Legendary"),
-        "warnings": warnings
+        **analyze_drops(items, idx, req.simulations),
     }
 
 # ============================================================
@@ -427,82 +468,44 @@ def simulate(req: SimulationRequest):
     description="Shows how loot shifts under luck biasing conditions.",
     response_model=dict
 )
+@_cpu_bound
 def simulate_with_luck(req: LuckSimulateRequest):
+    return _luck_simulation(req)
 
-    if req.simulations > 100_000:
-        raise HTTPException(400, "Simulation limit exceeded")
 
+def _luck_simulation(req: LuckSimulateRequest):
     luck = max(0.0, min(req.luck, 1.0))
     rng = get_rng(req.seed)
 
-    if req.tags:
-        items = extract_items_by_tags(LOOT_TABLE, req.tags)
-        if not items:
-            raise HTTPException(400, "No items match provided tags")
-    else:
-        items = extract_all_items(LOOT_TABLE)
-
-    adjusted_items = apply_luck(items, luck)
-    drops = simulate_drops(adjusted_items, rng, req.simulations)
-
-    rarity_counts = {}
-    item_counts = {}
-    item_rarity = {}
-
-    for item in drops:
-        rar = item["rarity"]
-        rarity_counts[rar] = rarity_counts.get(rar, 0) + 1
-
-        name = item["name"]
-        item_counts[name] = item_counts.get(name, 0) + 1
-        item_rarity[name] = rar
-
-    rarity_order = [
-        "Common",
-        "Uncommon",
-        "Rare",
-        "Epic",
-        "Legendary"
-    ]
-
-    rarity_distribution = {
-        r: round((rarity_counts.get(r, 0) / req.simulations) * 100, 2)
-        for r in rarity_order
-        if r in rarity_counts
-    }
+    items = _tag_pool(req.tags)
 
-    def top_by_rarity(target, limit=3):
-        return [
-            (name, count)
-            for name, count in sorted(
-                item_counts.items(),
-                key=lambda x: x[1],
-                reverse=True
-            )
-            if item_rarity.get(name) == target
-        ][:limit]
-
-    warnings = []
-
-    if rarity_distribution.get("Legendary", 0) < 0.5:
-        warnings.append("Legendary items drop less than 0.5% of the time.")
+    # Only rarity/name are read from drops: sample on luck weights directly
+    idx = simulate_drop_indices(items, rng, req.simulations, luck=luck)
 
     return {
         "luck": luck,
         "simulations": req.simulations,
-        "rarity_distribution": rarity_distribution,
-        "top_items_overall": sorted(
-            item_counts.items(),
-            key=lambda x: x[1],
-            reverse=True
-        )[:10],
-        "top_rare_items": top_by_rarity("Rare"),
-        "top_epic_items": top_by_rarity("Epic"),
-        "top_legendary_items": top_by_rarity("Legendary"),
-        "warnings": warnings
+        **analyze_drops(items, idx, req.simulations),
     }
 
 
+# ============================================================
+# SIMULATION BATCH
+# ============================================================
+
+@app.post(
+    "/simulate/batch",
+    tags=["Simulation"],
+    summary="Run several luck simulations in one call",
+    description="Luck sweeps / tag-filter comparisons without one HTTP round trip per config.",
+    response_model=dict
+)
+@_cpu_bound
+def simulate_batch(req: SimulationBatchRequest):
+    # one threadpool hop and CPU slot for the whole batch: the runs are
+    # short GIL-bound NumPy passes, so running them side by side gains nothing
+    return {"results": [_luck_simulation(run) for run in req.runs]}
+
 
 # ============================================================
 # SIMULATION COMPARISON
@@ -515,44 +518,29 @@ def simulate_with_luck(req: LuckSimulateRequest):
     description="Used by devs to evaluate impact on balance before shipping change.", 
     response_model=dict
 )
+@_cpu_bound
 def simulate_compare(req: CompareSimulationRequest):
 
-    if req.simulations > 100_000:
-        raise HTTPException(400, "Simulation limit exceeded")
-
     luck = max(0.0, min(req.luck, 1.0))
 
     rng_a = get_rng(req.seed)
     rng_b = get_rng(req.seed)
 
-    if req.tags:
-        base_items = extract_items_by_tags(LOOT_TABLE, req.tags)
-        if not base_items:
-            raise HTTPException(400, "No items match provided tags")
-    else:
-        base_items = extract_all_items(LOOT_TABLE)
-
-    lucky_items = apply_luck(base_items, luck)
-
-    drops_a = simulate_drops(base_items, rng_a, req.simulations)
-    drops_b = simulate_drops(lucky_items, rng_b, req.simulations)
-
-    def analyze(results):
-        rarity_counts = {}
-        for item in results:
-            r = item["rarity"]
-            rarity_counts[r] = rarity_counts.get(r, 0) + 1
-        return {
-            r: round((c / req.simulations) * 100, 2)
-            for r, c in rarity_counts.items()
-        }
+    base_items = _tag_pool(req.tags)
+
+    # Both runs draw from the same pool: label it once
+    codes = rarity_codes(base_items)
 
-    base_dist = analyze(drops_a)
-    luck_dist = analyze(drops_b)
+    idx = simulate_drop_indices(base_items, rng_a, req.simulations)
+    base_dist = rarity_percentages(codes, idx, req.simulations)
 
+    idx = simulate_drop_indices(base_items, rng_b, req.simulations, luck=luck)
+    luck_dist = rarity_percentages(codes, idx, req.simulations)
+
+    # base tiers first, then any only seen with luck (stable, unlike a set)
     delta = {
         r: round(luck_dist.get(r, 0) - base_dist.get(r, 0), 2)
-        for r in set(base_dist) | set(luck_dist)
+        for r in {**base_dist, **luck_dist}
     }
 
     return {
@@ -576,110 +564,84 @@ def simulate_compare(req: CompareSimulationRequest):
     description="Category %, rarity %, tag %, and stat curve averages included.", 
     response_model=dict
 )
-def balance_overview():
+async def balance_overview(request: Request):
+    return _static_response(request, *_balance_overview_json())
 
-    total_items = 0
 
-    rarity_counts = {
-        "Common": 0,
-        "Uncommon": 0,
-        "Rare": 0,
-        "Epic": 0,
-        "Legendary": 0,
-    }
+@cache
+def _balance_overview_json() -> tuple[bytes, str]:
+    # encoded (and ETagged) once, like the metadata payloads
+    return _static_json(_balance_overview_report())
 
-    category_counts = {}          # weapons/armor/…
-    item_type_counts = {}         # swords/boots/…
-    tag_counts = {}               # fire/melee/…
-    stat_totals_by_rarity = {}    # track attribute sums
-    stat_counts_by_rarity = {}    # track number of items used
-    
-    # walk entire loot table
-    for category_name, category in LOOT_TABLE.items():
-        category_counts[category_name] = category_counts.get(category_name, 0) + 0
-        
-        for item_type_name, rarities in category.items():
-            item_type_counts[item_type_name] = item_type_counts.get(item_type_name, 0) + 0
-
-            for rarity_name, items in rarities.items():
-
-                for item in items:
 
-                    total_items += 1
+@cache
+def _balance_overview_report():
+    # Pure function of the built-in table: computed on first request, then
+    # served from memory (the report dict must not be mutated by callers).
+    # Every figure is a bincount over the startup item columns.
+    total_items = len(ALL_ITEMS)
 
-                    # rarity
-                    rarity_counts[rarity_name.capitalize()] += 1
+    def percentages(counts):
+        if not total_items:
+            return {}
+        return {key: round((count / total_items) * 100, 2) for key, count in counts.items()}
 
-                    # category count finalization
-                    category_counts[category_name] += 1
-
-                    # item type count finalization
-                    item_type_counts[item_type_name] += 1
+    rarity_totals = np.bincount(ITEM_RARITY, minlength=len(RARITY_NAMES))
+    rarity_counts = {
+        rarity: int(rarity_totals[code]) for code, rarity in enumerate(RARITY_ORDER)
+    }
 
-                    # tags
-                    for tag in item.get("tags", []):
-                        tag_counts[tag] = tag_counts.get(tag, 0) + 1
+    category_totals = np.bincount(ITEM_CATEGORY, minlength=len(CATEGORY_NAMES))
+    category_counts = dict(zip(CATEGORY_NAMES, category_totals.tolist()))
 
-                    # stats
-                    stats = item.get("stats", {})
-                    if stats:
+    type_totals = np.bincount(ITEM_TYPE, minlength=len(TYPE_NAMES))
+    item_type_counts = dict(zip(TYPE_NAMES, type_totals.tolist()))
 
-                        # init rarity stat buckets
-                        if rarity_name not in stat_totals_by_rarity:
-                            stat_totals_by_rarity[rarity_name] = {}
-                            stat_counts_by_rarity[rarity_name] = 0
+    # tags in first-seen table order, then most common first (stable sort)
+    tag_totals = np.bincount(TAG_INDICES, minlength=len(TAG_CODE))
+    tags_seen, first_seen = np.unique(TAG_INDICES, return_index=True)
+    tags_seen = tags_seen[np.argsort(first_seen)]
+    tags_seen = tags_seen[np.argsort(-tag_totals[tags_seen], kind="stable")]
+    tag_population = {
+        ALL_TAGS_SORTED[code]: int(tag_totals[code]) for code in tags_seen.tolist()
+    }
 
-                        stat_counts_by_rarity[rarity_name] += 1
+    # average numeric stats per rarity, over the items that have stats;
+    # rarities in table order, stats in ALL_STATS_SORTED order
+    present = ~np.isnan(STAT_MATRIX)
+    with_stats = present.any(axis=1)
+    stat_codes = ITEM_RARITY[with_stats]
+    stat_rows = STAT_MATRIX[with_stats]
+    stat_present = present[with_stats]
+    items_per_rarity = np.bincount(stat_codes, minlength=len(RARITY_NAMES))
 
-                        for stat_name, value in stats.items():
-                            stat_totals_by_rarity[rarity_name][stat_name] = \
-                                stat_totals_by_rarity[rarity_name].get(stat_name, 0) + value
-            
-    # compute rarity %
-    rarity_percentages = {
-        rarity: round((count / total_items) * 100, 2)
-        for rarity, count in rarity_counts.items()
-        if total_items > 0
-    }    
-    
-    # compute average stats per rarity
     rarity_stat_averages = {}
-    
-    for rarity, totals in stat_totals_by_rarity.items():
-        rarity_stat_averages[rarity.capitalize()] = {
-            stat_name: round(totals[stat_name] / stat_counts_by_rarity[rarity], 2)
-            for stat_name in totals
+    codes_seen, first_seen = np.unique(stat_codes, return_index=True)
+    for code in codes_seen[np.argsort(first_seen)].tolist():
+        in_rarity = stat_codes == code
+        sums = np.where(stat_present[in_rarity], stat_rows[in_rarity], 0.0).sum(axis=0)
+        has_stat = stat_present[in_rarity].any(axis=0)
+        rarity_stat_averages[RARITY_NAMES[code].capitalize()] = {
+            stat: round(float(sums[col]) / int(items_per_rarity[code]), 2)
+            for col, stat in enumerate(ALL_STATS_SORTED)
+            if has_stat[col]
         }
-    
-    # compute category percentages
-    category_percentages = {
-        cat: round((count / total_items) * 100, 2)
-        for cat, count in category_counts.items()
-        if total_items > 0
-    }
-    
-    # compute item type percentage
-    item_type_percentages = {
-        typ: round((count / total_items) * 100, 2)
-        for typ, count in item_type_counts.items()
-        if total_items > 0
-    }
-    
+
     # build return
     return {
         "total_items": total_items,
-        
+
         "rarity_item_counts": rarity_counts,
-        "rarity_percentages": rarity_percentages,
-        
+        "rarity_percentages": percentages(rarity_counts),
+
         "category_counts": category_counts,
-        "category_percentages": category_percentages,
-        
+        "category_percentages": percentages(category_counts),
+
         "item_type_counts": item_type_counts,
-        "item_type_percentages": item_type_percentages,
-        
-        "tag_population": dict(sorted(tag_counts.items(), key=lambda x: x[1], reverse=True)),
-        
+        "item_type_percentages": percentages(item_type_counts),
+
+        "tag_population": tag_population,
+
         "rarity_stat_averages": rarity_stat_averages
     }
 
@@ -701,6 +663,7 @@ def balance_overview():
         "This endpoint NEVER modifies the stored loot table."
     ),
 )
+@_cpu_bound
 def balance_test_import(req: ImportTestRequest):
     # --------------------------------------------------
     # 1. Run validation
@@ -742,76 +705,66 @@ def balance_test_import(req: ImportTestRequest):
     # --------------------------------------------------
     # 4. Assemble response
     # --------------------------------------------------
-    return {
+    # corrected tables and previews are table-sized: render them directly
+    return ORJSONResponse({
         "name": req.name or "imported_loot_table",
         "valid": validation_result["valid"],
         "errors": validation_result["errors"],
         "warnings": validation_result["warnings"],
         "summary": validation_result["summary"],
         "compatibility": validation_result.get("compatibility", {}),
-        "auto_correct_preview": preview,
+        "auto_correct_preview": serialize_preview(preview),
         "auto_correct_diff": diff_only,
-        "profile_capabilities": capabilities,
+        "profile_capabilities": dict(capabilities),  # read-only view -> JSON
         "safe_auto_correct": {
             "requested": req.apply_safe_fixes,
             "applied": safe_apply_result is not None 
                         and safe_apply_result.get("applied_fix_count", 0) > 0,
             "result": safe_apply_result,
         },
-    }
+    })
 
 #=============================================================================================
 # Balance Suggestions
 #=============================================================================================
 
+# Expected rarity curve (% of drops), iterated in tier order
+_EXPECTED_RARITY_CURVE = (
+    ("Common", 70),
+    ("Uncommon", 20),
+    ("Rare", 7),
+    ("Epic", 2.5),
+    ("Legendary", 0.5),
+)
+
 @app.post(
     "/balance/suggestions",
     tags=["Balance Tools"],
     summary="Loot balancing recommendation engine",
     description="AI logic provides suggestions based on rarity, tags, type diversity.",
 )
+@_cpu_bound
 def balance_suggestions(req: BalanceRequest):
     rng = get_rng(req.seed)
 
     # Pull items
-    items = extract_all_items(LOOT_TABLE)
+    items = ALL_ITEMS
 
     # Run sim
-    drops = simulate_drops(items, rng, req.simulations)
+    idx = simulate_drop_indices(items, rng, req.simulations)
 
-    # Count structures
-    rarity_count = {}
-    tag_count = {}
-    type_count = {}
-
-    for item in drops:
-        rarity = item["rarity"]
-        rarity_count[rarity] = rarity_count.get(rarity, 0) + 1
-
-        for t in item.get("tags", []):
-            tag_count[t] = tag_count.get(t, 0) + 1
-
-        i_type = item["type"].lower()
-        type_count[i_type] = type_count.get(i_type, 0) + 1
-
-    # Convert rarity to %
-    rarity_percent = {
-        r: round((n / req.simulations) * 100, 2)
-        for r, n in rarity_count.items()
-    }
+    # Count structures (one pass over the draws, folded per label; keys in
+    # first-drawn order)
+    summary = summarize_draws(idx, len(items))
+    rarity_percent = rarity_percentages(ITEM_RARITY, idx, req.simulations, summary=summary)
+    tag_count = tag_tally(items, idx, summary)
+    # items carry no "type" field: their type is the table key they sit under
+    type_count = tally_codes(ITEM_TYPE, TYPE_NAMES, idx, summary)
 
     suggestions = []
 
     # 1. rarity curve expectations:
-    expected = {
-        "Common": 70,
-        "Uncommon": 20,
-        "Rare": 7,
-        "Epic": 2.5,
-        "Legendary": 0.5
-    }
-
-    for rarity, exp_val in expected.items():
+    for rarity, exp_val in _EXPECTED_RARITY_CURVE:
         current = rarity_percent.get(rarity, 0)
         delta = round(current - exp_val, 2)
 
@@ -860,8 +813,8 @@ def balance_suggestions(req: BalanceRequest):
     return {
         "simulations": req.simulations,
         "rarity_distribution": rarity_percent,
-        "tag_distribution": tag_count,
-        "type_distribution": type_count,
+        "tag_distribution": dict(tag_count),
+        "type_distribution": dict(type_count),
         "suggestions": suggestions
     }
 
@@ -869,33 +822,25 @@ def balance_suggestions(req: BalanceRequest):
 # Balance Reweight
 #===================================================================
 
-@app.post("/balance/reweight",
-          tags=["Balance Tools"],
-          summary="Analyze imbalance + calculate weight multipliers",
-          description="Provide rarity percentage targets. Total may be > or < 100, tool normalizes internally.")
-
+@app.post(
+    "/balance/reweight",
+    tags=["Balance Tools"],
+    summary="Analyze imbalance + calculate weight multipliers",
+    description="Provide rarity percentage targets. Total may be > or < 100, tool normalizes internally.",
+    response_model=dict
+)
+@_cpu_bound
 def balance_reweight(req: ReweightRequest):
-    if req.simulations > 100_000:
-        raise HTTPException(400, "Simulation limit exceeded")
-
     rng = get_rng(req.seed)
-    items = extract_all_items(LOOT_TABLE)
+    items = ALL_ITEMS
 
     # -------------------------------
     # Step 1: simulate natural rarity
     # -------------------------------
 
-    drops = simulate_drops(items, rng, req.simulations)
-
-    rarity_counts = {}
-    for item in drops:
-        r = item["rarity"]
-        rarity_counts[r] = rarity_counts.get(r, 0) + 1
-
-    current_dist = {
-        r: round((n / req.simulations) * 100, 4)
-        for r, n in rarity_counts.items()
-    }
+    idx = simulate_drop_indices(items, rng, req.simulations)
+    # ITEM_RARITY is already parallel to ALL_ITEMS: no per-request gather
+    current_dist = rarity_percentages(ITEM_RARITY, idx, req.simulations, ndigits=4)
 
     # -------------------------------
     # Step 2: extract target rarity
@@ -903,9 +848,7 @@ def balance_reweight(req: ReweightRequest):
     raw_target = req.target_rarity
 
     # Missing rarity protection
-    rarity_keys = ["Common", "Uncommon", "Rare", "Epic", "Legendary"]
-
-    for key in rarity_keys:
+    for key in RARITY_ORDER:
         if key not in raw_target:
             raw_target[key] = current_dist.get(key, 0)
 
@@ -993,16 +936,15 @@ def balance_reweight(req: ReweightRequest):
     summary="Modify table weights + export",
     description="Returns a downloadable loot table JSON with adjusted weights."
 )
+@_cpu_bound
 def balance_export(req: ExportRequest):
     
-    # Step 1: deep copy loot table
-    new_table = deepcopy(LOOT_TABLE)
-    
-    rarity_keys = ["Common", "Uncommon", "Rare", "Epic", "Legendary"]
+    # Step 1: copy of loot table (fresh items + drops, shared tags/stats)
+    new_table = reweightable_copy(LOOT_TABLE)
     
     # Step 2. validate input
     for rarity, mult in req.multipliers.items():
-        if rarity not in rarity_keys:
+        if rarity not in RARITY_ORDER:
             raise HTTPException(
                 400,
                 f"Invalid rarity multiplier: {rarity}"
@@ -1030,7 +972,7 @@ def balance_export(req: ExportRequest):
                     item["drop"]["weight"] = new_weight
     
     # Step 4: return downloable file
-    return JSONResponse(
+    return ORJSONResponse(
         content=new_table,
         headers={
             "Content-Disposition": "attachment; filename=new_loot_table.json"
@@ -1047,6 +989,7 @@ def balance_export(req: ExportRequest):
     summary="Return rarity multipliers only",
     description="Useful for lightweight client integrations & mobile applications."
 )
+@_cpu_bound
 def export_simple(req: ExportRequest):
     """
     Returns updated rarity multipliers only.
@@ -1068,6 +1011,7 @@ def export_simple(req: ExportRequest):
     summary="Return fully rewritten loot table",
     description="Produces a complete new loot table instance reflecting rarity weight changes."
 )
+@_cpu_bound
 def export_full(req: ExportRequest):
     """
     Applies rarity multipliers to loot table and returns a modified json structure.
@@ -1076,8 +1020,8 @@ def export_full(req: ExportRequest):
 
     multipliers = req.multipliers
 
-    # Soft copy to preserve original
-    new_table = copy.deepcopy(LOOT_TABLE)
+    # Soft copy to preserve original: only weights are rewritten below
+    new_table = reweightable_copy(LOOT_TABLE)
     
     # walk categories -> types -> rarity -> items
     for category, types in new_table.items():
@@ -1104,10 +1048,10 @@ def export_full(req: ExportRequest):
                     # round
                     item["drop"]["weight"] = round(new_weight)
     
-    return {
+    return ORJSONResponse({
         "success": True,
         "updated_loot_table": new_table
-    }
+    })
 
 #======================================================================
 # Export Corrected
@@ -1125,6 +1069,7 @@ def export_full(req: ExportRequest):
         "- AGGRESSIVE: advanced balancing (paid)"
     ),
 )
+@_cpu_bound
 def export_corrected_loot_table(req: ExportcorrectRequest):
     # 1. Validate first
     validation = validate_loot_table(req.loot_table)
@@ -1158,10 +1103,10 @@ def export_corrected_loot_table(req: ExportcorrectRequest):
         raise HTTPException(status_code=403, detail=str(e))
     
     # 3. Return export
-    return {
+    return ORJSONResponse({
         "name": req.name or "corrected_loot_table",
         "profile": req.auto_correct_profile,
         "valid": validation["valid"],
         "warnings": validation["warnings"],
         "exported_loot_table": corrected,
-    }
\ No newline at end of file
+    })
\ No newline at end of file
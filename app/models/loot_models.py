@@ -1,5 +1,5 @@
 from pydantic import BaseModel, Field
-from typing import List, Dict, Optional
+from typing import List, Dict
 
 class ItemEntry(BaseModel):
     name: str = Field(..., description="Name of the item")
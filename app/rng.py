@@ -1,4 +1,33 @@
-import random
+import os
 
-def get_rng(seed: int | None = None):
-    return random.Random(seed)
\ No newline at end of file
+import numpy as np
+
+# Unseeded requests draw from one process-wide stream: entropy-seeding a
+# fresh Generator costs ~12µs, longer than a whole single-item roll.
+# Generator methods lock their bit generator, so threads can share it.
+_unseeded = np.random.default_rng()
+
+
+def _reseed_after_fork():
+    # a forked worker must not replay its parent's stream. Only pre-fork
+    # launchers (gunicorn --preload) trigger this; run.py's uvicorn workers
+    # are spawned and import this module fresh.
+    global _unseeded
+    _unseeded = np.random.default_rng()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reseed_after_fork)
+
+
+def get_rng(seed: int | None = None) -> np.random.Generator:
+    """
+    Seeded NumPy generator (vectorized draws for simulations).
+    Negative seeds get their own stream instead of being rejected.
+    Without a seed, returns the shared process-wide generator.
+    """
+    if seed is None:
+        return _unseeded
+    if seed < 0:
+        return np.random.default_rng([1, -seed])
+    return np.random.default_rng(seed)
@@ -1,5 +1,5 @@
 
-from pydantic import BaseModel, Field, validator
+from pydantic import BaseModel, Field, field_validator
 from typing import Optional, List, Dict, Any, Literal
 from enum import Enum
 
@@ -56,7 +56,8 @@ class TagSearchRequest(BaseModel):
         description="Return all items that contain ALL these tags."
     )
 
-    @validator("tags")
+    @field_validator("tags")
+    @classmethod
     def non_empty(cls, v):
         if len(v) == 0:
             raise ValueError("tags list cannot be empty")
@@ -76,7 +77,8 @@ class TagDropRequest(BaseModel):
         description="Optional RNG seed"
     )
 
-    @validator("tags")
+    @field_validator("tags")
+    @classmethod
     def non_empty(cls, v):
         if len(v) == 0:
             raise ValueError("tags list cannot be empty")
@@ -138,6 +140,19 @@ class LuckSimulateRequest(SimulationRequest):
     )
 
 
+# -----------------------------
+# BATCH SIMULATION REQUEST
+# -----------------------------
+
+class SimulationBatchRequest(BaseModel):
+    runs: List[LuckSimulateRequest] = Field(
+        min_length=1,
+        max_length=32,
+        description="Simulation configs (e.g. a luck sweep), each run like "
+                    "/simulate/with-luck. Results come back in the same order."
+    )
+
+
 # -----------------------------
 # COMPARE SIMULATIONS
 # -----------------------------
@@ -172,11 +187,21 @@ class RarityTargets(BaseModel):
     Legendary: Optional[float] = None
     
 class BalanceRequest(BaseModel):
-    simulations: int = 50000
+    simulations: int = Field(
+        default=50000,
+        ge=1,
+        le=100_000,
+        description="Number of simulated rolls. Max: 100,000"
+    )
     seed: int | None = None
 
 class ReweightRequest(BaseModel):
-    simulations: int = 20000
+    simulations: int = Field(
+        default=20000,
+        ge=1,
+        le=100_000,
+        description="Number of simulated rolls. Max: 100,000"
+    )
     seed: Optional[int] = None
     target_rarity: Dict[str, float] = Field(
         default_factory=dict,
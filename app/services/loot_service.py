@@ -1,7 +1,6 @@
 import random
 from collections import Counter
-from typing import List
-from app.models.loot_models import ItemEntry, LootTable
+from app.models.loot_models import LootTable
 
 def generate_drop(loot_table: LootTable) -> str:
     """Returns a single random item based on weights."""
@@ -12,8 +11,11 @@ def generate_drop(loot_table: LootTable) -> str:
 
 def simulate_drops(loot_table: LootTable, simulations: int) -> dict:
     """Simulate multiple drops and return count statistics."""
-    results = [generate_drop(loot_table) for _ in range(simulations)]
-    counts = Counter(results)
+    # One batched draw: names/weights and the cumulative table are built
+    # once, not per drop (same random() sequence as repeated single drops)
+    names = [item.name for item in loot_table.items]
+    weights = [item.rarity for item in loot_table.items]
+    counts = Counter(random.choices(names, weights=weights, k=simulations))
     return dict(counts)
 
 def balance_suggestion(loot_table, simulation_results: dict) -> dict:
@@ -0,0 +1,56 @@
+# run.py
+"""
+Production entry point: multi-process uvicorn for the CPU-bound /simulate*
+and /balance/* routes. For local development use
+`uvicorn app.main:app --reload` instead.
+
+Parallelism is per request, not within one: a 100k-roll simulation is a
+sub-millisecond vectorized pass, so splitting it across cores would cost
+more in dispatch than it saves (and change every seeded result). Add
+workers to use more cores.
+
+uvicorn spawns its workers, so each one imports app.main and parses and
+indexes the loot table itself; nothing is shared copy-on-write. To load
+the table once and fork workers from it, use a pre-fork launcher instead:
+  gunicorn app.main:app --preload -k uvicorn.workers.UvicornWorker -w N
+
+Environment:
+  HOST, PORT               bind address (default 0.0.0.0:8000)
+  WEB_CONCURRENCY          worker processes (default: one per CPU)
+  LIMIT_CONCURRENCY        max in-flight connections per worker before 503s
+  LOOT_API_THREADS         threadpool size per worker for sync handlers
+                           (read by app.main at startup)
+  LOOT_API_CPU_SLOTS       concurrent simulation/balance handlers per worker
+                           (read by app.main; default here: 2, since the
+                           workers already cover the cores. app.main alone
+                           defaults to one per CPU.)
+  LOOT_API_PREVIEW_CACHE   auto-correct previews cached per worker, keyed on
+                           a hash of the table (default: 0, off)
+"""
+
+import os
+
+import uvicorn
+
+
+def _env_int(name, default=None):
+    value = os.environ.get(name)
+    return int(value) if value else default
+
+
+if __name__ == "__main__":
+    # Spawned workers inherit this. With one process per CPU, app.main's
+    # own default (one slot per CPU) would allow CPU² simulations at once.
+    os.environ.setdefault("LOOT_API_CPU_SLOTS", "2")
+    uvicorn.run(
+        "app.main:app",
+        host=os.environ.get("HOST", "0.0.0.0"),
+        port=_env_int("PORT", 8000),
+        # simulations hold the GIL between NumPy calls: scale with processes
+        workers=_env_int("WEB_CONCURRENCY", os.cpu_count() or 1),
+        # uvloop / httptools when installed (uvicorn[standard]), else asyncio / h11
+        loop="auto",
+        http="auto",
+        interface="asgi3",
+        limit_concurrency=_env_int("LIMIT_CONCURRENCY"),
+    )